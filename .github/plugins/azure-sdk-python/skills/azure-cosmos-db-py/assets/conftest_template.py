@@ -40,7 +40,8 @@ def mock_cosmos_container() -> MagicMock:
     container.read_item.return_value = None
     container.upsert_item.side_effect = lambda doc: doc  # Return the doc
     container.delete_item.return_value = None
-    container.query_items.return_value = iter([])
+    # query_items(...).by_page() yields no pages unless configured
+    container.query_items.return_value.by_page.return_value.continuation_token = None
 
     return container
 
@@ -105,9 +106,11 @@ def mock_cosmos_async(mock_cosmos_container: MagicMock, mocker) -> MagicMock:
         doc_type: str,
         partition_key: str | None = None,
         extra_filter: str | None = None,
-        parameters: list | None = None,
-    ) -> list[dict]:
-        return list(mock_cosmos_container.query_items())
+        params: dict | None = None,
+        max_items: int = 100,
+        continuation: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        return list(mock_cosmos_container.query_items()), None
 
     mocker.patch("app.db.cosmos.upsert_document", side_effect=mock_upsert)
     mocker.patch("app.db.cosmos.get_document", side_effect=mock_get)
@@ -2,22 +2,42 @@
 Cosmos DB Client Module Template
 
 Production-ready Azure Cosmos DB NoSQL client with:
-- Dual authentication (DefaultAzureCredential for Azure, key for emulator)
+- Dual authentication (managed identity/env/CLI credential chain for Azure, key for emulator)
 - Singleton pattern for connection reuse
 - Async wrapping via run_in_threadpool
 - Graceful error handling
 
 Usage:
     from app.db.cosmos import get_container, upsert_document, get_document
+
+    # Open connections and fetch the first token before serving traffic
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await warmup()
+        yield
 """
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Optional
-
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import requests
 from azure.cosmos import ContainerProxy, CosmosClient
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from azure.identity import DefaultAzureCredential
+from azure.core.pipeline.transport import RequestsTransport
+from azure.identity import (
+    AzureCliCredential,
+    ChainedTokenCredential,
+    EnvironmentCredential,
+    ManagedIdentityCredential,
+)
+from requests.adapters import HTTPAdapter
 from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
@@ -26,8 +46,13 @@ logger = logging.getLogger(__name__)
 
 # Module-level singleton state
 _cosmos_container: Optional[ContainerProxy] = None
-_credential: Optional[DefaultAzureCredential] = None
+_credential: Optional[ChainedTokenCredential] = None
+_transport: Optional[RequestsTransport] = None
 _init_attempted: bool = False
+_init_lock = threading.Lock()
+
+# Per-host keep-alive pool size; the requests default (10) stalls under fan-out
+_CONNECTION_POOL_SIZE = 200
 
 
 def _is_emulator_endpoint(endpoint: str) -> bool:
@@ -35,23 +60,52 @@ def _is_emulator_endpoint(endpoint: str) -> bool:
     return "localhost" in endpoint.lower() or "127.0.0.1" in endpoint
 
 
+def _create_transport() -> RequestsTransport:
+    """Create an HTTP transport with a pre-sized keep-alive connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_CONNECTION_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RequestsTransport(session=session, session_owner=True)
+
+
 def _create_client() -> CosmosClient:
     """Create Cosmos client with appropriate authentication."""
-    global _credential
+    global _credential, _transport
+
+    # Kept so reset_connection can close the pooled connections
+    _transport = _create_transport()
 
     if _is_emulator_endpoint(settings.cosmos_endpoint):
         logger.info("Using Cosmos emulator with key authentication")
+        # Trust the emulator's self-signed CA (from /_explorer/emulator.pem) so
+        # TLS stays verified and sessions can be resumed across connections
+        if settings.cosmos_emulator_cert:
+            connection_verify: str | bool = settings.cosmos_emulator_cert
+        else:
+            logger.warning("COSMOS_EMULATOR_CERT not set; TLS verification disabled")
+            connection_verify = False
         return CosmosClient(
             url=settings.cosmos_endpoint,
             credential=settings.cosmos_key,
-            connection_verify=False,  # Emulator uses self-signed cert
+            connection_verify=connection_verify,
+            transport=_transport,
         )
     else:
-        logger.info("Using Azure Cosmos with DefaultAzureCredential (RBAC)")
-        _credential = DefaultAzureCredential()
+        logger.info("Using Azure Cosmos with token credential chain (RBAC)")
+        # Only the sources actually used (managed identity in Azure, service
+        # principal env vars in CI, Azure CLI for local dev), so token refreshes
+        # don't probe every credential type. The client's bearer token policy
+        # caches tokens until near expiry and handles claims challenges.
+        _credential = ChainedTokenCredential(
+            ManagedIdentityCredential(),
+            EnvironmentCredential(),
+            AzureCliCredential(),
+        )
         return CosmosClient(
             url=settings.cosmos_endpoint,
             credential=_credential,
+            transport=_transport,
         )
 
 
@@ -59,6 +113,9 @@ def get_container() -> Optional[ContainerProxy]:
     """
     Get Cosmos container proxy, initializing on first call.
 
+    Thread-safe: concurrent first calls block on a lock so only one client
+    (and one connection pool) is ever created.
+
     Returns:
         ContainerProxy if connection successful, None otherwise.
     """
@@ -67,36 +124,258 @@ def get_container() -> Optional[ContainerProxy]:
     if _init_attempted:
         return _cosmos_container
 
-    _init_attempted = True
+    with _init_lock:
+        # Another thread may have finished init while we waited
+        if _init_attempted:
+            return _cosmos_container
 
-    try:
-        client = _create_client()
-        database = client.get_database_client(settings.cosmos_database_name)
-        _cosmos_container = database.get_container_client(settings.cosmos_container_id)
+        try:
+            client = _create_client()
+            database = client.get_database_client(settings.cosmos_database_name)
+            container = database.get_container_client(settings.cosmos_container_id)
 
-        # Verify connection with lightweight operation
-        _cosmos_container.read()
+            # Verify connection with lightweight operation
+            container.read()
+            _cosmos_container = container
 
-        logger.info(
-            f"✅ Cosmos DB connected: {settings.cosmos_database_name}/{settings.cosmos_container_id}"
-        )
+            logger.info(
+                f"✅ Cosmos DB connected: {settings.cosmos_database_name}/{settings.cosmos_container_id}"
+            )
 
-    except Exception as e:
-        logger.error(f"❌ Cosmos DB connection failed: {type(e).__name__}: {e}")
-        import traceback
+        except Exception:
+            logger.exception("❌ Cosmos DB connection failed")
+            _cosmos_container = None
 
-        logger.error(traceback.format_exc())
-        _cosmos_container = None
+        _init_attempted = True
 
     return _cosmos_container
 
 
 def reset_connection() -> None:
     """Reset connection for testing or environment switching."""
-    global _cosmos_container, _credential, _init_attempted
-    _cosmos_container = None
-    _credential = None
-    _init_attempted = False
+    global _cosmos_container, _credential, _transport, _init_attempted
+    with _init_lock:
+        # Close the old client's connection pool and credential so repeated
+        # resets don't leak sessions
+        if _transport is not None:
+            _transport.close()
+        if _credential is not None:
+            _credential.close()
+        _cosmos_container = None
+        _credential = None
+        _transport = None
+        _init_attempted = False
+    _selectivity_cache.clear()
+    _feed_ranges.clear()
+
+
+async def warmup(n_connections: int = 4) -> None:
+    """
+    Initialize the client and pre-open connections at application startup.
+
+    Moves TLS handshakes and the first AAD token fetch (done by the
+    verification read in get_container) off the first user request. Failures
+    are logged by get_container and never raised.
+
+    Args:
+        n_connections: Number of concurrent lightweight reads used to open pooled connections
+    """
+    container = await run_in_threadpool(get_container)
+    if container is None:
+        return
+
+    await asyncio.gather(
+        *(run_in_threadpool(container.read) for _ in range(n_connections)),
+        return_exceptions=True,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Query Selectivity Cache
+# -----------------------------------------------------------------------------
+
+# Literals and @params are replaced so queries differing only in values share stats
+_QUERY_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|@\w+|\b\d+(?:\.\d+)?\b")
+_QUERY_METRICS_HEADER = "x-ms-documentdb-query-metrics"
+_SELECTIVITY_CACHE_SIZE = 256
+_SELECTIVITY_WARMUP_SAMPLES = 3
+_PARALLEL_SELECTIVITY_THRESHOLD = 0.1
+
+# Query shape -> (avg retrieved docs, avg output docs, samples), in LRU order
+_selectivity_cache: OrderedDict[str, tuple[float, float, int]] = OrderedDict()
+
+# Physical partition feed ranges, refreshed periodically to pick up splits
+_FEED_RANGE_TTL_SECONDS = 300
+_feed_ranges: list[dict[str, Any]] = []
+_feed_ranges_expires_at: float = 0.0
+
+
+def _query_shape(query: str) -> str:
+    """Normalize a SQL query to its shape (literals and parameters stripped)."""
+    return _QUERY_LITERAL_RE.sub("?", query)
+
+
+@lru_cache(maxsize=256)
+def _build_query(extra_filter: Optional[str]) -> tuple[str, str]:
+    """
+    Build (and memoize) the SQL text and shape for a docType query.
+
+    Returning the identical string for identical filters keeps the SQL text
+    stable, which lets Cosmos reuse its cached query plan.
+    """
+    query = "SELECT * FROM c WHERE c.docType = @docType"
+    if extra_filter:
+        query += f" {extra_filter}"
+    return query, _query_shape(query)
+
+
+def _needs_query_metrics(shape: str) -> bool:
+    """Check whether a query shape still needs metrics samples."""
+    stats = _selectivity_cache.get(shape)
+    return stats is None or stats[2] < _SELECTIVITY_WARMUP_SAMPLES
+
+
+def _record_query_metrics(shape: str, headers: dict[str, Any]) -> None:
+    """Fold retrieved/output document counts from query metrics into the cache."""
+    raw = headers.get(_QUERY_METRICS_HEADER)
+    if not raw:
+        return
+
+    metrics = dict(part.split("=", 1) for part in raw.split(";") if "=" in part)
+    try:
+        retrieved = float(metrics["retrievedDocumentCount"])
+        output = float(metrics["outputDocumentCount"])
+    except (KeyError, ValueError):
+        return
+
+    avg_retrieved, avg_output, samples = _selectivity_cache.pop(shape, (0.0, 0.0, 0))
+    samples += 1
+    _selectivity_cache[shape] = (
+        avg_retrieved + (retrieved - avg_retrieved) / samples,
+        avg_output + (output - avg_output) / samples,
+        samples,
+    )
+    if len(_selectivity_cache) > _SELECTIVITY_CACHE_SIZE:
+        _selectivity_cache.popitem(last=False)
+
+
+def _prefer_parallel(shape: str, max_items: int) -> bool:
+    """
+    Decide whether a cross-partition query shape is worth fanning out in parallel.
+
+    Selective queries (few output docs per scanned doc) have to visit most
+    partitions to fill a page, so parallel fan-out pays off. Non-selective
+    queries fill a page from the first partitions and are cheaper serially.
+    Only shapes whose average result also fits in one page qualify, since the
+    fan-out returns no continuation token. Unknown shapes default to serial.
+    """
+    stats = _selectivity_cache.get(shape)
+    if stats is None:
+        return False
+
+    _selectivity_cache.move_to_end(shape)
+    avg_retrieved, avg_output, _ = stats
+    if avg_retrieved <= 0 or avg_output > max_items:
+        return False
+    return avg_output / avg_retrieved < _PARALLEL_SELECTIVITY_THRESHOLD
+
+
+def _demote_parallel(shape: str) -> None:
+    """
+    Forget a shape's stats after its parallel fan-out did not fit in one page.
+
+    Without samples the shape runs serially and collects fresh metrics, so a
+    shape whose results outgrew a page stops paying for fan-out and serial
+    paging on every call; it is promoted again only if new samples agree.
+    """
+    _selectivity_cache.pop(shape, None)
+
+
+# -----------------------------------------------------------------------------
+# Write Coalescing
+# -----------------------------------------------------------------------------
+
+
+class UpsertBuffer:
+    """
+    Coalesce upserts that share a partition key into transactional batches.
+
+    Writes are buffered per partition key for up to max_delay_ms (or until
+    max_batch documents are queued) and flushed with a single
+    execute_item_batch call. Each caller still awaits its own result.
+
+    Opt-in via settings.cosmos_coalesce_writes: a whole batch succeeds or
+    fails together, and every write waits up to max_delay_ms.
+    """
+
+    def __init__(self, max_batch: int = 100, max_delay_ms: float = 5) -> None:
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000
+        self._pending: dict[str, list[tuple[dict[str, Any], asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def upsert(
+        self, container: ContainerProxy, doc: dict[str, Any], partition_key: str
+    ) -> dict[str, Any]:
+        """Queue a document for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        bucket = self._pending.setdefault(partition_key, [])
+        bucket.append((doc, future))
+
+        if len(bucket) >= self._max_batch:
+            self._flush(container, partition_key)
+        elif len(bucket) == 1:
+            self._timers[partition_key] = loop.call_later(
+                self._max_delay, self._flush, container, partition_key
+            )
+
+        return await future
+
+    def _flush(self, container: ContainerProxy, partition_key: str) -> None:
+        """Hand the pending bucket for a partition key to a background flush."""
+        # A size-triggered flush must not leave the delay timer to fire on the
+        # key's next bucket
+        timer = self._timers.pop(partition_key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(partition_key, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._execute(container, partition_key, batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _execute(
+        self,
+        container: ContainerProxy,
+        partition_key: str,
+        batch: list[tuple[dict[str, Any], asyncio.Future]],
+    ) -> None:
+        """Execute one transactional batch and resolve the waiting futures."""
+        operations = [("upsert", (doc,)) for doc, _ in batch]
+        try:
+            results = await run_in_threadpool(
+                container.execute_item_batch,
+                batch_operations=operations,
+                partition_key=partition_key,
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (doc, future), op_result in zip(batch, results):
+            if not future.done():
+                future.set_result(op_result.get("resourceBody", doc))
+
+
+_upsert_buffer = UpsertBuffer()
 
 
 # -----------------------------------------------------------------------------
@@ -122,6 +401,9 @@ async def upsert_document(doc: dict[str, Any], partition_key: str) -> dict[str,
     if container is None:
         raise RuntimeError("Cosmos DB not initialized")
 
+    if settings.cosmos_coalesce_writes:
+        return await _upsert_buffer.upsert(container, doc, partition_key)
+
     result = await run_in_threadpool(container.upsert_item, doc)
     return result
 
@@ -182,44 +464,181 @@ async def query_documents(
     doc_type: str,
     partition_key: Optional[str] = None,
     extra_filter: Optional[str] = None,
-    parameters: Optional[list[dict[str, Any]]] = None,
-) -> list[dict[str, Any]]:
+    params: Optional[dict[str, Any]] = None,
+    max_items: int = 100,
+    continuation: Optional[str] = None,
+) -> tuple[list[dict[str, Any]], Optional[str]]:
     """
-    Query documents by type with optional filters.
+    Query a single page of documents by type with optional filters.
+
+    Only one page is fetched per call, so memory and RU cost stay bounded
+    regardless of result size. Pass the returned continuation token back in
+    to fetch the next page. Cross-partition queries the selectivity cache has
+    learned are selective are fanned out across partitions in parallel; when
+    the whole result fits in one page it is returned with no continuation
+    token, otherwise the query falls back to serial paging and the shape is
+    re-sampled before it is fanned out again.
 
     Args:
         doc_type: Document type to filter by (docType field)
         partition_key: Partition key for efficient query (None for cross-partition)
         extra_filter: Additional SQL WHERE clause (e.g., "AND c.slug = @slug")
-        parameters: Query parameters list (e.g., [{"name": "@slug", "value": "my-slug"}])
+        params: Query parameter values by name, without "@" (e.g., {"slug": "my-slug"})
+        max_items: Maximum number of documents to return in this page
+        continuation: Continuation token from a previous call (None for first page)
 
     Returns:
-        List of matching documents
+        Tuple of (documents in this page, continuation token or None when exhausted)
     """
     container = get_container()
     if container is None:
-        return []
+        return [], None
 
     # Build parameterized query
-    query = "SELECT * FROM c WHERE c.docType = @docType"
+    query, shape = _build_query(extra_filter)
     query_params: list[dict[str, Any]] = [{"name": "@docType", "value": doc_type}]
 
-    if extra_filter:
-        query += f" {extra_filter}"
-        query_params.extend(parameters or [])
+    if extra_filter and params:
+        query_params.extend({"name": f"@{name}", "value": value} for name, value in params.items())
 
     # Execute query
+    sample_metrics = False
+    response_headers: dict[str, Any] = {}
     if partition_key:
         items = container.query_items(
             query=query,
             parameters=query_params,
             partition_key=partition_key,
+            max_item_count=max_items,
+            populate_query_metrics=False,
         )
     else:
+        if continuation is None and _prefer_parallel(shape, max_items):
+            page = await _query_feed_ranges_parallel(container, query, query_params, max_items)
+            if page is not None:
+                return page, None
+            _demote_parallel(shape)
+
+        def capture_headers(headers: dict[str, Any], _: Any) -> None:
+            # Keep only the latest page's headers; merging would let a stale
+            # metrics header from an earlier page outlive a page without one
+            response_headers.clear()
+            response_headers.update(headers)
+
+        sample_metrics = _needs_query_metrics(shape)
         items = container.query_items(
             query=query,
             parameters=query_params,
             enable_cross_partition_query=True,
+            max_item_count=max_items,
+            populate_query_metrics=sample_metrics,
+            # The connection's last_response_headers is shared by concurrent
+            # requests, so capture this query's headers as its pages arrive
+            response_hook=capture_headers,
         )
 
-    return await run_in_threadpool(list, items)
+    pager = items.by_page(continuation_token=continuation)
+    page = await run_in_threadpool(_next_page, pager)
+
+    if sample_metrics:
+        _record_query_metrics(shape, response_headers)
+
+    return page, pager.continuation_token
+
+
+async def iter_documents(
+    doc_type: str,
+    partition_key: Optional[str] = None,
+    extra_filter: Optional[str] = None,
+    params: Optional[dict[str, Any]] = None,
+    page_size: int = 100,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream all matching documents, fetching one page at a time.
+
+    Only a single page is held in memory, and iteration can stop early
+    without paying for the remaining pages.
+
+    Args:
+        doc_type: Document type to filter by (docType field)
+        partition_key: Partition key for efficient query (None for cross-partition)
+        extra_filter: Additional SQL WHERE clause (e.g., "AND c.slug = @slug")
+        params: Query parameter values by name, without "@" (e.g., {"slug": "my-slug"})
+        page_size: Number of documents fetched per round trip
+
+    Yields:
+        Matching documents
+    """
+    continuation: Optional[str] = None
+    while True:
+        page, continuation = await query_documents(
+            doc_type,
+            partition_key=partition_key,
+            extra_filter=extra_filter,
+            params=params,
+            max_items=page_size,
+            continuation=continuation,
+        )
+        for doc in page:
+            yield doc
+        if not continuation:
+            return
+
+
+def _get_feed_ranges(container: ContainerProxy) -> list[dict[str, Any]]:
+    """Return the container's physical partition feed ranges (blocking, TTL-cached)."""
+    global _feed_ranges_expires_at
+
+    now = time.monotonic()
+    if not _feed_ranges or now >= _feed_ranges_expires_at:
+        _feed_ranges[:] = container.read_feed_ranges()
+        _feed_ranges_expires_at = now + _FEED_RANGE_TTL_SECONDS
+    return _feed_ranges
+
+
+async def _query_feed_ranges_parallel(
+    container: ContainerProxy,
+    query: str,
+    query_params: list[dict[str, Any]],
+    max_items: int,
+) -> Optional[list[dict[str, Any]]]:
+    """
+    Run a selective cross-partition query against every feed range concurrently.
+
+    Each range is read for a single page of at most max_items documents, so
+    memory stays bounded by the number of ranges (latency is
+    max-of-partitions rather than sum-of-partitions).
+
+    Returns:
+        The merged documents, or None if the result does not fit in one page
+        (a range has more pages or the ranges together exceed max_items)
+    """
+    feed_ranges = await run_in_threadpool(_get_feed_ranges, container)
+
+    def query_range(feed_range: dict[str, Any]) -> Optional[list[dict[str, Any]]]:
+        pager = container.query_items(
+            query=query,
+            parameters=query_params,
+            feed_range=feed_range,
+            max_item_count=max_items,
+        ).by_page()
+        page = _next_page(pager)
+        return None if pager.continuation_token else page
+
+    pages = await asyncio.gather(
+        *(run_in_threadpool(query_range, feed_range) for feed_range in feed_ranges)
+    )
+
+    docs: list[dict[str, Any]] = []
+    for page in pages:
+        if page is None or len(docs) + len(page) > max_items:
+            return None
+        docs.extend(page)
+    return docs
+
+
+def _next_page(pager: Iterable[Iterable[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Fetch the next page from a query pager (blocking)."""
+    for page in pager:
+        return list(page)
+    return []
@@ -20,6 +20,7 @@ from app.db.cosmos import (
     delete_document,
     get_container,
     get_document,
+    iter_documents,
     query_documents,
     upsert_document,
 )
@@ -125,11 +126,12 @@ class EntityService:
         counter = 1
 
         while True:
-            existing = await query_documents(
+            existing, _ = await query_documents(
                 doc_type="entity",  # TODO: Change to your entity type
                 partition_key=workspace_id,
                 extra_filter="AND c.slug = @slug",
-                parameters=[{"name": "@slug", "value": slug}],
+                params={"slug": slug},
+                max_items=1,
             )
             if not existing:
                 return slug
@@ -218,11 +220,12 @@ class EntityService:
         if not self._use_cosmos():
             return None
 
-        docs = await query_documents(
+        docs, _ = await query_documents(
             doc_type="entity",  # TODO: Change to your entity type
             partition_key=workspace_id,
             extra_filter="AND c.slug = @slug",
-            parameters=[{"name": "@slug", "value": slug}],
+            params={"slug": slug},
+            max_items=1,
         )
 
         if not docs:
@@ -290,6 +293,9 @@ class EntityService:
         """
         List all entities in a workspace.
 
+        Documents are streamed one page at a time, so only the converted
+        entities are held in memory, not the raw query results.
+
         Args:
             workspace_id: Workspace ID (partition key)
 
@@ -299,14 +305,12 @@ class EntityService:
         if not self._use_cosmos():
             return []
 
-        docs = await query_documents(
-            doc_type="entity",  # TODO: Change to your entity type
-            partition_key=workspace_id,
-        )
-
         return [
             self._model_in_db_to_model(self._doc_to_model_in_db(doc))
-            for doc in docs
+            async for doc in iter_documents(
+                doc_type="entity",  # TODO: Change to your entity type
+                partition_key=workspace_id,
+            )
         ]
 
 
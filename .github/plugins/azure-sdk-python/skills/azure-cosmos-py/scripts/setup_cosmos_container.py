@@ -9,6 +9,7 @@ Usage:
     python setup_cosmos_container.py --database mydb --container orders --partition-key /customer_id
     python setup_cosmos_container.py --database mydb --container events --partition-key /device_id /day --throughput 1000
     python setup_cosmos_container.py --database mydb --container data --partition-key /pk --serverless
+    python setup_cosmos_container.py --database mydb --container orders --partition-key /customer_id --include-paths /status/? /created_at/?
 
 Environment Variables:
     COSMOS_ENDPOINT  - Cosmos DB account endpoint URL
@@ -16,6 +17,7 @@ Environment Variables:
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
@@ -25,6 +27,9 @@ from azure.identity import DefaultAzureCredential
 from azure.cosmos import CosmosClient, PartitionKey
 from azure.cosmos.exceptions import CosmosHttpResponseError
 
+# Excluded by the service on every container, whether or not a policy lists it
+ETAG_PATH = '/"_etag"/?'
+
 
 def get_cosmos_client() -> CosmosClient:
     """Create Cosmos DB client from environment variables."""
@@ -46,26 +51,35 @@ def create_indexing_policy(
     exclude_paths: list[str] | None = None,
     composite_indexes: list[list[dict]] | None = None
 ) -> dict[str, Any]:
-    """Build an indexing policy."""
+    """Build an indexing policy.
+
+    Without include paths every property is indexed ("/*"). With include
+    paths only those are indexed and everything else is excluded; write RU
+    cost grows with the number of indexed properties, so indexing only the
+    paths you filter or sort on keeps upserts cheap. Including "/*" yourself
+    opts back into indexing everything.
+    """
+    include_paths = include_paths or ["/*"]
+    
+    for p in [*include_paths, *(exclude_paths or [])]:
+        if not p.startswith("/"):
+            raise ValueError(f"Index path must start with '/': {p}")
+    
     policy = {
         "indexingMode": "consistent",
         "automatic": True,
-        "includedPaths": [],
-        "excludedPaths": []
+        "includedPaths": [{"path": p} for p in include_paths],
+        # Always exclude _etag
+        "excludedPaths": [{"path": ETAG_PATH}]
     }
     
-    # Include paths (default: all)
-    if include_paths:
-        policy["includedPaths"] = [{"path": p} for p in include_paths]
-    else:
-        policy["includedPaths"] = [{"path": "/*"}]
+    # Exclude everything not explicitly included
+    if "/*" not in include_paths:
+        policy["excludedPaths"].insert(0, {"path": "/*"})
     
-    # Exclude paths
+    # Additional exclusions (under included subtrees when excluding by default)
     if exclude_paths:
-        policy["excludedPaths"] = [{"path": p} for p in exclude_paths]
-    
-    # Always exclude _etag
-    policy["excludedPaths"].append({"path": "/_etag/?")})
+        policy["excludedPaths"].extend({"path": p} for p in exclude_paths)
     
     # Composite indexes for ORDER BY on multiple fields
     if composite_indexes:
@@ -135,9 +149,30 @@ def create_container(
             print(f"Error creating container: {e.message}")
             raise
     
-    # Get container properties
+    # Reconcile settings on existing containers (no-op when already in sync)
     properties = container.read()
     
+    if indexing_policy:
+        current_policy = properties.get("indexingPolicy", {})
+        if policy_digest(current_policy) != policy_digest(indexing_policy):
+            print("Updating indexing policy")
+            container = database.replace_container(
+                container,
+                partition_key=partition_key,
+                indexing_policy=indexing_policy,
+                default_ttl=ttl if ttl is not None else properties.get("defaultTtl")
+            )
+            properties = container.read()
+    
+    if throughput:
+        try:
+            current_throughput = container.get_throughput().offer_throughput
+        except CosmosHttpResponseError:
+            current_throughput = None  # Serverless or database-level throughput
+        if current_throughput is not None and current_throughput != throughput:
+            print(f"Updating throughput: {current_throughput} -> {throughput} RU/s")
+            container.replace_throughput(throughput)
+    
     return {
         "database": database_id,
         "container": container_id,
@@ -147,12 +182,44 @@ def create_container(
     }
 
 
+def normalize_indexing_policy(policy: dict[str, Any]) -> dict[str, Any]:
+    """Reduce an indexing policy to the settings this tool manages.
+
+    The service echoes a policy back with defaults filled in, paths in its
+    own order and _etag always excluded, so only the indexing mode, the
+    include/exclude path sets and the composite indexes are compared.
+    """
+    return {
+        "indexingMode": policy.get("indexingMode", "consistent").lower(),
+        "automatic": policy.get("automatic", True),
+        "includedPaths": sorted({p["path"] for p in policy.get("includedPaths", [])}),
+        "excludedPaths": sorted(
+            {p["path"] for p in policy.get("excludedPaths", [])} | {ETAG_PATH}
+        ),
+        # Order matters within a composite index but not between them
+        "compositeIndexes": sorted(
+            [[p["path"], p.get("order", "ascending").lower()] for p in composite]
+            for composite in policy.get("compositeIndexes", [])
+        ),
+    }
+
+
+def policy_digest(policy: dict[str, Any]) -> str:
+    """Hash the normalized form of an indexing policy as canonical JSON."""
+    canonical = json.dumps(
+        normalize_indexing_policy(policy), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
 def show_container_info(client: CosmosClient, database_id: str, container_id: str):
     """Display detailed container information."""
     database = client.get_database_client(database_id)
     container = database.get_container_client(container_id)
     
-    properties = container.read()
+    # Quota info exposes document count via headers without a fan-out query
+    properties = container.read(populate_quota_info=True)
+    usage = container.client_connection.last_response_headers.get("x-ms-resource-usage", "")
     
     print("\n=== Container Information ===")
     print(f"Database: {database_id}")
@@ -182,15 +249,30 @@ def show_container_info(client: CosmosClient, database_id: str, container_id: st
     except Exception:
         print("Throughput: Serverless or database-level")
     
-    # Item count (approximate)
+    # Item count from resource usage metadata, falling back to a COUNT query
+    count = parse_resource_usage(usage).get("documentsCount")
+    if count is not None:
+        print(f"Item Count: {count}")
+        return
+    
     try:
         query = "SELECT VALUE COUNT(1) FROM c"
         count = list(container.query_items(query=query, enable_cross_partition_query=True))[0]
-        print(f"Item Count: ~{count}")
+        print(f"Item Count: ~{count} (approx, cross-partition query)")
     except Exception:
         print("Item Count: Unable to retrieve")
 
 
+def parse_resource_usage(header: str) -> dict[str, int]:
+    """Parse an x-ms-resource-usage header ("key=value;...") into a dict."""
+    usage = {}
+    for part in header.split(";"):
+        key, sep, value = part.partition("=")
+        if sep and value.strip().isdigit():
+            usage[key.strip()] = int(value)
+    return usage
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Create and configure Cosmos DB containers",
@@ -229,6 +311,11 @@ def main():
         type=int,
         help="Default TTL in seconds (-1 for per-item TTL)"
     )
+    parser.add_argument(
+        "--include-paths",
+        nargs="+",
+        help="Paths to index (e.g., /customer_id/? /status/?). All other paths are excluded (default: index all paths)"
+    )
     parser.add_argument(
         "--exclude-paths",
         nargs="+",
@@ -284,7 +371,7 @@ def main():
     
     # Build indexing policy
     indexing_policy = None
-    if args.exclude_paths or args.composite_index:
+    if args.include_paths or args.exclude_paths or args.composite_index:
         composite_indexes = None
         if args.composite_index:
             composite_indexes = [
@@ -292,10 +379,15 @@ def main():
                 for index_paths in args.composite_index
             ]
         
-        indexing_policy = create_indexing_policy(
-            exclude_paths=args.exclude_paths,
-            composite_indexes=composite_indexes
-        )
+        try:
+            indexing_policy = create_indexing_policy(
+                include_paths=args.include_paths,
+                exclude_paths=args.exclude_paths,
+                composite_indexes=composite_indexes
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
     
     # Create container
     try:
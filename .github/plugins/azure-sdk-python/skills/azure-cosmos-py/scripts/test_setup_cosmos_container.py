@@ -0,0 +1,125 @@
+"""Tests for setup_cosmos_container indexing policy handling."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("azure.cosmos")
+pytest.importorskip("azure.identity")
+
+from setup_cosmos_container import (  # noqa: E402
+    create_container,
+    create_indexing_policy,
+    policy_digest,
+)
+
+
+def server_policy(policy: dict) -> dict:
+    """Echo a policy back the way the service returns it: reordered paths,
+    _etag listed first, default fields and composite orders filled in."""
+    return {
+        "indexingMode": "Consistent",
+        "automatic": True,
+        "includedPaths": list(reversed(policy["includedPaths"])),
+        "excludedPaths": [{"path": '/"_etag"/?'}]
+        + [p for p in reversed(policy["excludedPaths"]) if p["path"] != '/"_etag"/?'],
+        "compositeIndexes": list(reversed(policy.get("compositeIndexes", []))),
+        "spatialIndexes": [],
+    }
+
+
+def make_client(indexing_policy: dict) -> tuple[MagicMock, MagicMock]:
+    container = MagicMock()
+    container.read.return_value = {
+        "id": "orders",
+        "indexingPolicy": server_policy(indexing_policy),
+        "_rid": "rid",
+        "_self": "dbs/rid/colls/rid/",
+        "_etag": '"00000000-0000"',
+    }
+    database = MagicMock()
+    database.create_container_if_not_exists.return_value = container
+    client = MagicMock()
+    client.create_database_if_not_exists.return_value = database
+    return client, database
+
+
+class TestCreateIndexingPolicy:
+    def test_indexes_everything_without_include_paths(self):
+        policy = create_indexing_policy(exclude_paths=["/large/*"])
+
+        assert policy["includedPaths"] == [{"path": "/*"}]
+        assert {"path": "/*"} not in policy["excludedPaths"]
+        assert {"path": "/large/*"} in policy["excludedPaths"]
+
+    def test_excludes_everything_else_with_include_paths(self):
+        policy = create_indexing_policy(include_paths=["/status/?"])
+
+        assert policy["includedPaths"] == [{"path": "/status/?"}]
+        assert {"path": "/*"} in policy["excludedPaths"]
+
+    def test_explicit_root_include_is_not_also_excluded(self):
+        policy = create_indexing_policy(include_paths=["/*"])
+
+        assert {"path": "/*"} not in policy["excludedPaths"]
+
+    def test_rejects_relative_paths(self):
+        with pytest.raises(ValueError):
+            create_indexing_policy(include_paths=["status/?"])
+
+
+class TestPolicyDigest:
+    def test_ignores_server_normalization(self):
+        policy = create_indexing_policy(
+            include_paths=["/status/?", "/created_at/?"],
+            composite_indexes=[
+                [
+                    {"path": "/status", "order": "ascending"},
+                    {"path": "/created_at", "order": "descending"},
+                ],
+                [{"path": "/a", "order": "ascending"}, {"path": "/b", "order": "ascending"}],
+            ],
+        )
+
+        assert policy_digest(server_policy(policy)) == policy_digest(policy)
+
+    def test_detects_path_changes(self):
+        old = create_indexing_policy(include_paths=["/status/?"])
+        new = create_indexing_policy(include_paths=["/status/?", "/created_at/?"])
+
+        assert policy_digest(server_policy(old)) != policy_digest(new)
+
+    def test_composite_path_order_matters(self):
+        composite = [{"path": "/a", "order": "ascending"}, {"path": "/b", "order": "ascending"}]
+        forward = create_indexing_policy(composite_indexes=[composite])
+        backward = create_indexing_policy(composite_indexes=[list(reversed(composite))])
+
+        assert policy_digest(forward) != policy_digest(backward)
+
+
+class TestCreateContainer:
+    def test_second_run_with_same_policy_is_a_no_op(self):
+        policy = create_indexing_policy(
+            include_paths=["/status/?", "/created_at/?"],
+            exclude_paths=["/status/history/*"],
+            composite_indexes=[
+                [
+                    {"path": "/status", "order": "ascending"},
+                    {"path": "/created_at", "order": "ascending"},
+                ]
+            ],
+        )
+        client, database = make_client(policy)
+
+        create_container(client, "db", "orders", ["/customer_id"], indexing_policy=policy)
+
+        database.replace_container.assert_not_called()
+
+    def test_replaces_a_changed_policy(self):
+        current = create_indexing_policy(include_paths=["/status/?"])
+        wanted = create_indexing_policy(include_paths=["/status/?", "/created_at/?"])
+        client, database = make_client(current)
+
+        create_container(client, "db", "orders", ["/customer_id"], indexing_policy=wanted)
+
+        database.replace_container.assert_called_once()
@@ -4,6 +4,7 @@ Create Azure AI Search agentic retrieval infrastructure.
 
 Usage:
     python setup_agentic_retrieval.py --index-name <name> --kb-name <name> [options]
+    python setup_agentic_retrieval.py --index-name <name> --kb-name <name> --credential cli
 
 Environment variables required:
     SEARCH_ENDPOINT: Azure AI Search endpoint
@@ -16,7 +17,8 @@ Environment variables required:
 
 import argparse
 import os
-from azure.identity import DefaultAzureCredential
+import sys
+from typing import TYPE_CHECKING
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents.indexes.models import (
     SearchIndex, SearchField, VectorSearch, VectorSearchProfile,
@@ -28,6 +30,44 @@ from azure.search.documents.indexes.models import (
     KnowledgeSourceReference, KnowledgeRetrievalOutputMode
 )
 
+if TYPE_CHECKING:
+    from azure.core.credentials import TokenCredential
+
+
+REQUIRED_ENV_VARS = ("SEARCH_ENDPOINT", "AOAI_ENDPOINT")
+
+
+def validate_environment() -> bool:
+    """Check required environment variables are set and non-empty."""
+    env = os.environ
+    missing = [v for v in REQUIRED_ENV_VARS if not env.get(v)]
+    if missing:
+        print(f"Error: missing required environment variables: {', '.join(missing)}")
+        return False
+    return True
+
+
+def get_credential(kind: str = "default") -> "TokenCredential":
+    """Create the selected credential without probing unused sources.
+
+    azure.identity is imported lazily so --help and environment validation
+    failures don't pay for loading it.
+    """
+    if kind == "cli":
+        from azure.identity import AzureCliCredential
+        return AzureCliCredential()
+    if kind == "managed":
+        from azure.identity import ManagedIdentityCredential
+        return ManagedIdentityCredential()
+    if kind == "env":
+        from azure.identity import EnvironmentCredential
+        return EnvironmentCredential()
+    from azure.identity import DefaultAzureCredential
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_shared_token_cache_credential=True
+    )
+
 
 def create_index(client: SearchIndexClient, name: str, aoai_endpoint: str,
                  embedding_deployment: str, embedding_model: str,
@@ -125,8 +165,14 @@ def main():
                        help="Vector dimensions (default: 3072)")
     parser.add_argument("--answer-instructions", default="",
                        help="Custom answer synthesis instructions")
+    parser.add_argument("--credential", choices=["cli", "managed", "env", "default"],
+                       default="default",
+                       help="Credential type to use (default: DefaultAzureCredential chain)")
     args = parser.parse_args()
 
+    if not validate_environment():
+        sys.exit(1)
+
     # Load environment
     search_endpoint = os.environ["SEARCH_ENDPOINT"]
     aoai_endpoint = os.environ["AOAI_ENDPOINT"]
@@ -137,7 +183,7 @@ def main():
 
     ks_name = args.ks_name or f"{args.index_name}-source"
 
-    credential = DefaultAzureCredential()
+    credential = get_credential(args.credential)
     client = SearchIndexClient(endpoint=search_endpoint, credential=credential)
 
     print(f"Creating index '{args.index_name}'...")
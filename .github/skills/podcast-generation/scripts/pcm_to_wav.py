@@ -7,22 +7,36 @@ This script converts it to standard WAV format for browser playback.
 Usage:
     from pcm_to_wav import pcm_to_wav
     wav_bytes = pcm_to_wav(pcm_data, sample_rate=24000)
+
+    # Large files: stream from disk without loading the payload into memory
+    from pcm_to_wav import write_wav
+    write_wav("episode.pcm", "episode.wav")
 """
 
+import os
+import shutil
 import struct
-import io
+import sys
+from typing import Iterable, List, Union
+
+# RIFF header, fmt subchunk and data subchunk header (44 bytes total)
+_HEADER_STRUCT = struct.Struct('<4sI4s4sIHHIIHH4sI')
 
 
 def pcm_to_wav(
-    pcm_data: bytes,
+    pcm_data: Union[bytes, bytearray, memoryview],
     sample_rate: int = 24000,
     channels: int = 1,
     sample_width: int = 2
 ) -> bytes:
     """Convert raw PCM audio data to WAV format.
     
+    The header and payload are joined in a single copy, so a bytearray ring
+    buffer or memoryview slice can be passed without first converting it to
+    bytes.
+    
     Args:
-        pcm_data: Raw PCM audio bytes
+        pcm_data: Raw PCM audio bytes (any C-contiguous buffer)
         sample_rate: Samples per second (default 24000 for gpt-realtime-mini)
         channels: Number of audio channels (default 1 for mono)
         sample_width: Bytes per sample (default 2 for 16-bit)
@@ -30,44 +44,96 @@ def pcm_to_wav(
     Returns:
         WAV-formatted audio bytes
     """
-    wav_buffer = io.BytesIO()
+    payload = memoryview(pcm_data).cast('B')
+    header = _wav_header(payload.nbytes, sample_rate, channels, sample_width)
+    return b''.join((header, payload))
+
+
+def write_wav(
+    pcm_path: str,
+    wav_path: str,
+    sample_rate: int = 24000,
+    channels: int = 1,
+    sample_width: int = 2
+) -> int:
+    """Convert a PCM file to a WAV file, streaming the payload.
     
-    # RIFF header
-    wav_buffer.write(b'RIFF')
-    wav_buffer.write(struct.pack('<I', 36 + len(pcm_data)))  # File size - 8
-    wav_buffer.write(b'WAVE')
+    Only the 44-byte header is built in memory; the PCM payload is copied
+    in-kernel with os.sendfile on Linux, or in 1 MiB chunks elsewhere.
     
-    # fmt subchunk
-    wav_buffer.write(b'fmt ')
-    wav_buffer.write(struct.pack('<I', 16))                    # Subchunk size
-    wav_buffer.write(struct.pack('<H', 1))                     # Audio format (1 = PCM)
-    wav_buffer.write(struct.pack('<H', channels))              # Number of channels
-    wav_buffer.write(struct.pack('<I', sample_rate))           # Sample rate
-    wav_buffer.write(struct.pack('<I', sample_rate * channels * sample_width))  # Byte rate
-    wav_buffer.write(struct.pack('<H', channels * sample_width))  # Block align
-    wav_buffer.write(struct.pack('<H', sample_width * 8))      # Bits per sample
+    Args:
+        pcm_path: Path to the raw PCM input file
+        wav_path: Path to the WAV output file
+        sample_rate: Samples per second (default 24000 for gpt-realtime-mini)
+        channels: Number of audio channels (default 1 for mono)
+        sample_width: Bytes per sample (default 2 for 16-bit)
     
-    # data subchunk
-    wav_buffer.write(b'data')
-    wav_buffer.write(struct.pack('<I', len(pcm_data)))
-    wav_buffer.write(pcm_data)
+    Returns:
+        Number of PCM payload bytes written
+    """
+    data_len = os.stat(pcm_path).st_size
+    with open(pcm_path, 'rb') as src, open(wav_path, 'wb') as dst:
+        dst.write(_wav_header(data_len, sample_rate, channels, sample_width))
+        dst.flush()
+        if sys.platform == 'linux':
+            offset = 0
+            while offset < data_len:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, data_len - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src, dst, length=1 << 20)
+    return data_len
+
+
+def _header_fields(data_len: int, sample_rate: int, channels: int, sample_width: int) -> tuple:
+    """Field values for _HEADER_STRUCT for a PCM payload of data_len bytes."""
+    return (
+        b'RIFF', 36 + data_len, b'WAVE',                # File size - 8
+        b'fmt ', 16, 1,                                 # Subchunk size, PCM format
+        channels, sample_rate,
+        sample_rate * channels * sample_width,          # Byte rate
+        channels * sample_width,                        # Block align
+        sample_width * 8,                               # Bits per sample
+        b'data', data_len,
+    )
+
+
+def _wav_header(data_len: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """Build the 44-byte WAV header for a PCM payload of data_len bytes."""
+    return _HEADER_STRUCT.pack(*_header_fields(data_len, sample_rate, channels, sample_width))
+
+
+def calculate_duration(
+    pcm_data: Union[bytes, bytearray, memoryview],
+    sample_rate: int = 24000,
+    sample_width: int = 2,
+    channels: int = 1
+) -> float:
+    """Calculate audio duration in seconds from PCM data length.
     
-    return wav_buffer.getvalue()
+    Returns fractional seconds and accounts for the channel count, so a
+    stereo payload is not reported at twice its length.
+    """
+    return memoryview(pcm_data).nbytes / (sample_rate * channels * sample_width)
 
 
-def calculate_duration(pcm_data: bytes, sample_rate: int = 24000, sample_width: int = 2) -> int:
-    """Calculate audio duration in seconds from PCM data length."""
-    return len(pcm_data) // (sample_rate * sample_width)
+def calculate_durations(
+    lengths: Iterable[int],
+    sample_rate: int = 24000,
+    sample_width: int = 2,
+    channels: int = 1
+) -> List[float]:
+    """Calculate durations in seconds for many PCM payloads from their byte lengths."""
+    bytes_per_second = sample_rate * channels * sample_width
+    return [length / bytes_per_second for length in lengths]
 
 
 if __name__ == "__main__":
     # Example usage
-    import sys
     if len(sys.argv) > 1:
-        with open(sys.argv[1], 'rb') as f:
-            pcm_data = f.read()
-        wav_data = pcm_to_wav(pcm_data)
         output_path = sys.argv[1].replace('.pcm', '.wav')
-        with open(output_path, 'wb') as f:
-            f.write(wav_data)
-        print(f"Converted to {output_path} ({calculate_duration(pcm_data)}s)")
+        data_len = write_wav(sys.argv[1], output_path)
+        duration = calculate_durations([data_len])[0]
+        print(f"Converted to {output_path} ({duration:.1f}s)")
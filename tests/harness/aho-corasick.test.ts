@@ -0,0 +1,169 @@
+/**
+ * Tests for AhoCorasick
+ *
+ * Validates that every occurrence of every registered word is reported,
+ * including overlapping and nested matches, and that the automaton stays
+ * correct when words are added after it has been used.
+ */
+
+import { describe, it, expect } from "vitest";
+import { AhoCorasick, type AhoCorasickMatch } from "./aho-corasick.js";
+
+// =============================================================================
+// Helpers
+// =============================================================================
+
+function collect<T>(ac: AhoCorasick<T>, text: string): Array<[number, number, string, T]> {
+  return [...ac.iter(text)].map((m: AhoCorasickMatch<T>) => [m.start, m.end, m.word, m.value]);
+}
+
+/**
+ * Reference matcher: every (start, word) pair found by indexOf, ordered the
+ * way the automaton reports them (by end, longer first).
+ */
+function naiveMatches(words: string[], text: string): Array<[number, number, string]> {
+  const found: Array<[number, number, string]> = [];
+  for (const word of new Set(words)) {
+    for (let i = text.indexOf(word); i !== -1; i = text.indexOf(word, i + 1)) {
+      found.push([i, i + word.length, word]);
+    }
+  }
+  return found.sort((a, b) => a[1] - b[1] || b[2].length - a[2].length);
+}
+
+// =============================================================================
+// AhoCorasick
+// =============================================================================
+
+describe("AhoCorasick", () => {
+  describe("add", () => {
+    it("rejects empty words", () => {
+      const ac = new AhoCorasick<number>();
+      expect(() => ac.add("", 1)).toThrow("non-empty");
+    });
+
+    it("counts distinct words only", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("client", 1);
+      ac.add("client", 2);
+      ac.add("credential", 3);
+      expect(ac.size).toBe(2);
+    });
+  });
+
+  describe("iter", () => {
+    it("reports overlapping matches", () => {
+      const ac = new AhoCorasick<string>();
+      for (const word of ["he", "she", "his", "hers"]) {
+        ac.add(word, word);
+      }
+
+      expect(collect(ac, "ushers")).toEqual([
+        [1, 4, "she", "she"],
+        [2, 4, "he", "he"],
+        [2, 6, "hers", "hers"],
+      ]);
+    });
+
+    it("reports every word sharing a suffix, longest first", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("cd", 1);
+      ac.add("abcd", 2);
+      ac.add("bcd", 3);
+
+      expect(collect(ac, "xabcd")).toEqual([
+        [1, 5, "abcd", 2],
+        [2, 5, "bcd", 3],
+        [3, 5, "cd", 1],
+      ]);
+    });
+
+    it("reports repeated occurrences of one word", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("aa", 1);
+
+      expect(collect(ac, "aaaa").map(([start]) => start)).toEqual([0, 1, 2]);
+    });
+
+    it("yields each value registered for a word", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("close()", 1);
+      ac.add("close()", 2);
+
+      expect(collect(ac, "client.close()").map(([, , , value]) => value)).toEqual([1, 2]);
+    });
+
+    it("finds nothing in text without registered words", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("DefaultAzureCredential", 1);
+
+      expect(collect(ac, "ManagedIdentityCredential()")).toEqual([]);
+      expect(collect(new AhoCorasick<number>(), "anything")).toEqual([]);
+    });
+
+    it("agrees with a naive matcher", () => {
+      const alphabet = "abc";
+      let seed = 7;
+      const random = (n: number): number => {
+        seed = (seed * 1103515245 + 12345) % 2147483648;
+        return seed % n;
+      };
+      const randomString = (maxLength: number): string => {
+        let s = "";
+        for (let i = 1 + random(maxLength); i > 0; i--) {
+          s += alphabet.charAt(random(alphabet.length));
+        }
+        return s;
+      };
+
+      for (let round = 0; round < 200; round++) {
+        const words = Array.from({ length: 1 + random(6) }, () => randomString(4));
+        const text = randomString(30);
+        const ac = new AhoCorasick<string>();
+        for (const word of words) {
+          ac.add(word, word);
+        }
+
+        const actual = [...ac.iter(text)]
+          .filter((m, i, all) => all.findIndex((o) => o.start === m.start && o.word === m.word) === i)
+          .map((m): [number, number, string] => [m.start, m.end, m.word]);
+        expect(actual).toEqual(naiveMatches(words, text));
+      }
+    });
+  });
+
+  describe("matches", () => {
+    it("tells whether any word occurs", () => {
+      const ac = new AhoCorasick<number>();
+      ac.add("begin_analyze", 1);
+
+      expect(ac.matches("poller = client.begin_analyze(...)")).toBe(true);
+      expect(ac.matches("poller = client.analyze(...)")).toBe(false);
+    });
+  });
+
+  describe("adding after use", () => {
+    it("finds words added after a scan", () => {
+      const ac = new AhoCorasick<string>();
+      ac.add("ab", "ab");
+      expect(collect(ac, "xabc")).toEqual([[1, 3, "ab", "ab"]]);
+
+      ac.add("b", "b");
+      ac.add("bc", "bc");
+      expect(collect(ac, "xabc")).toEqual([
+        [1, 3, "ab", "ab"],
+        [2, 3, "b", "b"],
+        [2, 4, "bc", "bc"],
+      ]);
+    });
+
+    it("rebuilds failure links for words that extend existing paths", () => {
+      const ac = new AhoCorasick<string>();
+      ac.add("abcx", "abcx");
+      expect(ac.matches("zabcd")).toBe(false);
+
+      ac.add("bcd", "bcd");
+      expect(collect(ac, "zabcd")).toEqual([[2, 5, "bcd", "bcd"]]);
+    });
+  });
+});
@@ -0,0 +1,174 @@
+/**
+ * Aho-Corasick Multi-Pattern Matcher
+ *
+ * Finds every occurrence of a set of literal strings in a single left-to-right
+ * pass over the text, independent of how many strings are registered. Used by
+ * the evaluator to decide which criteria patterns are worth verifying.
+ */
+
+// =============================================================================
+// Types
+// =============================================================================
+
+/**
+ * A single literal match reported by the automaton.
+ */
+export interface AhoCorasickMatch<T> {
+  /** Index of the first character of the match in the scanned text */
+  start: number;
+  /** Index one past the last character of the match */
+  end: number;
+  /** The registered word that matched */
+  word: string;
+  /** Value registered with the word */
+  value: T;
+}
+
+interface TrieNode<T> {
+  next: Map<string, TrieNode<T>>;
+  /** Longest proper suffix of this node that is also a trie path */
+  fail: TrieNode<T> | null;
+  /** Nearest node along the fail chain that ends a word */
+  output: TrieNode<T> | null;
+  depth: number;
+  word: string | null;
+  values: T[];
+}
+
+function createNode<T>(depth: number): TrieNode<T> {
+  return { next: new Map(), fail: null, output: null, depth, word: null, values: [] };
+}
+
+// =============================================================================
+// AhoCorasick
+// =============================================================================
+
+/**
+ * Aho-Corasick automaton over UTF-16 code units.
+ *
+ * Usage:
+ * ```typescript
+ * const ac = new AhoCorasick<string>();
+ * ac.add("DefaultAzureCredential", "auth");
+ * for (const match of ac.iter(code)) {
+ *   console.log(match.value, match.start);
+ * }
+ * ```
+ */
+export class AhoCorasick<T> {
+  private readonly root: TrieNode<T> = createNode(0);
+  private built = false;
+  private wordCount = 0;
+
+  /**
+   * Number of distinct words registered.
+   */
+  get size(): number {
+    return this.wordCount;
+  }
+
+  /**
+   * Register a word. A word may be added more than once with different values.
+   */
+  add(word: string, value: T): void {
+    if (!word) {
+      throw new Error("AhoCorasick words must be non-empty");
+    }
+
+    let node = this.root;
+    for (let i = 0; i < word.length; i++) {
+      const ch = word.charAt(i);
+      let child = node.next.get(ch);
+      if (!child) {
+        child = createNode(node.depth + 1);
+        node.next.set(ch, child);
+      }
+      node = child;
+    }
+
+    if (node.word === null) {
+      node.word = word;
+      this.wordCount++;
+    }
+    node.values.push(value);
+    this.built = false;
+  }
+
+  /**
+   * Yield every match in the text, including overlapping ones, ordered by end
+   * position (longer matches first for the same end).
+   */
+  *iter(text: string): Generator<AhoCorasickMatch<T>> {
+    this.build();
+
+    let node = this.root;
+    for (let i = 0; i < text.length; i++) {
+      node = this.step(node, text.charAt(i));
+
+      for (
+        let hit = node.word !== null ? node : node.output;
+        hit !== null;
+        hit = hit.output
+      ) {
+        for (const value of hit.values) {
+          yield { start: i + 1 - hit.depth, end: i + 1, word: hit.word ?? "", value };
+        }
+      }
+    }
+  }
+
+  /**
+   * Return true if any registered word occurs in the text.
+   */
+  matches(text: string): boolean {
+    return !this.iter(text).next().done;
+  }
+
+  private step(node: TrieNode<T>, ch: string): TrieNode<T> {
+    let current: TrieNode<T> | null = node;
+    while (current !== null) {
+      const child = current.next.get(ch);
+      if (child) {
+        return child;
+      }
+      current = current.fail;
+    }
+    return this.root;
+  }
+
+  /**
+   * Compute fail and output links breadth-first. Runs lazily after adds.
+   */
+  private build(): void {
+    if (this.built) {
+      return;
+    }
+
+    const queue: TrieNode<T>[] = [];
+    for (const child of this.root.next.values()) {
+      child.fail = this.root;
+      child.output = null;
+      queue.push(child);
+    }
+
+    for (let head = 0; head < queue.length; head++) {
+      const node = queue[head];
+      if (!node) {
+        break;
+      }
+
+      for (const [ch, child] of node.next) {
+        let fail = node.fail;
+        while (fail !== null && !fail.next.has(ch)) {
+          fail = fail.fail;
+        }
+        const target = fail?.next.get(ch) ?? this.root;
+        child.fail = target;
+        child.output = target.word !== null ? target : target.output;
+        queue.push(child);
+      }
+    }
+
+    this.built = true;
+  }
+}
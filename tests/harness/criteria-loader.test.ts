@@ -0,0 +1,170 @@
+/**
+ * Tests for AcceptanceCriteriaLoader
+ *
+ * Validates parsing of a sample acceptance-criteria.md (rule descriptions,
+ * correct/incorrect assignment per code block) and that cached criteria are
+ * re-read when the file changes on disk.
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from "vitest";
+import { mkdirSync, mkdtempSync, rmSync, statSync, utimesSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { AcceptanceCriteriaLoader, getRule } from "./criteria-loader.js";
+
+// =============================================================================
+// Fixtures
+// =============================================================================
+
+const SKILL_NAME = "sample-py";
+
+const SAMPLE_CRITERIA = `# Acceptance Criteria: sample-py
+
+## Overview
+
+Patterns for the sample SDK.
+
+\`\`\`python
+from sample import SampleClient
+\`\`\`
+
+## Client Creation
+
+
+Create the client with a credential.
+Reuse it across calls.
+
+### ✅ Correct
+\`\`\`python
+client = SampleClient(endpoint, credential)
+\`\`\`
+
+### ❌ Incorrect
+\`\`\`python
+client = SampleClient(endpoint, "key")
+\`\`\`
+
+## Async Usage
+Always close clients.
+
+\`\`\`python
+async with SampleClient(endpoint, credential) as client:
+    await client.ping()
+\`\`\`
+`;
+
+function writeCriteria(baseDir: string, content: string): string {
+  const dir = join(baseDir, ".github", "skills", SKILL_NAME, "references");
+  mkdirSync(dir, { recursive: true });
+  const path = join(dir, "acceptance-criteria.md");
+  writeFileSync(path, content);
+  return path;
+}
+
+// =============================================================================
+// AcceptanceCriteriaLoader
+// =============================================================================
+
+describe("AcceptanceCriteriaLoader", () => {
+  let baseDir: string;
+  let criteriaPath: string;
+
+  beforeEach(() => {
+    baseDir = mkdtempSync(join(tmpdir(), "criteria-loader-"));
+    criteriaPath = writeCriteria(baseDir, SAMPLE_CRITERIA);
+  });
+
+  afterEach(() => {
+    rmSync(baseDir, { recursive: true, force: true });
+  });
+
+  describe("load", () => {
+    it("builds one rule per section with examples, skipping overviews", () => {
+      const criteria = new AcceptanceCriteriaLoader(baseDir).load(SKILL_NAME);
+
+      expect(criteria.skillName).toBe(SKILL_NAME);
+      expect(criteria.language).toBe("python");
+      expect(criteria.rules.map((rule) => rule.name)).toEqual(["Client Creation", "Async Usage"]);
+    });
+
+    it("takes the first paragraph as the description, after leading blank lines", () => {
+      const criteria = new AcceptanceCriteriaLoader(baseDir).load(SKILL_NAME);
+
+      expect(getRule(criteria, "Client Creation")?.description).toBe(
+        "Create the client with a credential. Reuse it across calls."
+      );
+      expect(getRule(criteria, "async usage")?.description).toBe("Always close clients.");
+    });
+
+    it("assigns each code block the marker that precedes it", () => {
+      const criteria = new AcceptanceCriteriaLoader(baseDir).load(SKILL_NAME);
+      const rule = getRule(criteria, "Client Creation");
+
+      expect(rule?.correctPatterns.map((p) => p.code)).toEqual([
+        "client = SampleClient(endpoint, credential)",
+      ]);
+      expect(rule?.incorrectPatterns.map((p) => p.code)).toEqual([
+        'client = SampleClient(endpoint, "key")',
+      ]);
+    });
+
+    it("only looks at the 200 characters before each block's code for markers", () => {
+      const head = "## Credentials\n\n### ❌ Incorrect\n\nNever hard-code keys.\n\n";
+      const block = "### ✅ Correct\n```python\ncredential = DefaultAzureCredential()\n```\n";
+      // Pad so the ❌ marker sits 205 characters before the code: outside
+      // the window ending at the code, inside one ending at the fence
+      const markerToEnd = head.length - head.indexOf("❌");
+      const padding = "x".repeat(205 - markerToEnd - block.indexOf("credential") - 2) + "\n\n";
+      writeCriteria(baseDir, head + padding + block);
+
+      const criteria = new AcceptanceCriteriaLoader(baseDir).load(SKILL_NAME);
+
+      expect(criteria.correctPatterns.map((p) => p.code)).toEqual([
+        "credential = DefaultAzureCredential()",
+      ]);
+    });
+
+    it("treats unmarked code blocks as correct", () => {
+      const criteria = new AcceptanceCriteriaLoader(baseDir).load(SKILL_NAME);
+
+      expect(criteria.correctPatterns.map((p) => p.section)).toEqual([
+        "Overview",
+        "Client Creation",
+        "Async Usage",
+      ]);
+      expect(criteria.incorrectPatterns.map((p) => p.section)).toEqual(["Client Creation"]);
+    });
+
+    it("throws for a skill without criteria", () => {
+      expect(() => new AcceptanceCriteriaLoader(baseDir).load("missing-py")).toThrow(
+        "Acceptance criteria not found"
+      );
+    });
+  });
+
+  describe("caching", () => {
+    it("returns the cached criteria while the file is unchanged", () => {
+      const loader = new AcceptanceCriteriaLoader(baseDir);
+
+      expect(loader.load(SKILL_NAME)).toBe(loader.load(SKILL_NAME));
+    });
+
+    it("re-reads the file when its modification time changes", () => {
+      const loader = new AcceptanceCriteriaLoader(baseDir);
+      const first = loader.load(SKILL_NAME);
+
+      // Same size, so only the new mtime can invalidate the entry
+      const { mtime } = statSync(criteriaPath);
+      writeFileSync(criteriaPath, SAMPLE_CRITERIA.replace('"key"', '"pwd"'));
+      const later = new Date(mtime.getTime() + 5000);
+      utimesSync(criteriaPath, later, later);
+
+      const second = loader.load(SKILL_NAME);
+
+      expect(second).not.toBe(first);
+      expect(second.incorrectPatterns.map((p) => p.code)).toEqual([
+        'client = SampleClient(endpoint, "pwd")',
+      ]);
+    });
+  });
+});
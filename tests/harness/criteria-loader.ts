@@ -5,7 +5,7 @@
  * structured validation rules including correct/incorrect code patterns.
  */
 
-import { readFileSync, readdirSync, existsSync } from "node:fs";
+import { readFileSync, readdirSync, existsSync, statSync } from "node:fs";
 import { join, resolve } from "node:path";
 import type {
   AcceptanceCriteria,
@@ -27,6 +27,55 @@ import {
 const SKILLS_DIR = ".github/skills";
 const CRITERIA_FILENAME = "references/acceptance-criteria.md";
 
+// Compiled once; global regexes are only used via matchAll/match, which
+// don't leak lastIndex state between calls
+const SECTION_SPLIT_REGEX = /^## /m;
+const CODE_BLOCK_REGEX = /```(\w+)?\n([\s\S]*?)```/g;
+const IMPORT_REGEX = /from\s+([\w.]+)\s+import\s+([\w,\s]+)/g;
+// First paragraph: skip leading blank lines, then take non-blank lines up to
+// a blank line or a line starting with a heading or code fence
+const DESCRIPTION_REGEX = /^(?:[^\S\n]*\n)*((?:(?!```|#)[^\n]*\S[^\n]*(?:\n|$))+)/;
+
+// One alternation per marker group so each section is scanned once per group
+const CORRECT_MARKER_REGEX = /✅|Correct|DO:|Good/g;
+const INCORRECT_MARKER_REGEX = /❌|Incorrect|DON'T:|Bad|Anti-pattern/g;
+
+const SKIP_RULE_KEYWORDS = ["overview", "introduction", "quick reference"] as const;
+
+// Parsed criteria keyed by resolved path + mtime + size, so edits invalidate
+// entries automatically. Map insertion order doubles as LRU order.
+const CRITERIA_CACHE_SIZE = 64;
+const criteriaCache = new Map<string, AcceptanceCriteria>();
+
+// Lower-cased rule name index per rules array, built on first getRule call
+const ruleIndexCache = new WeakMap<ValidationRule[], Map<string, ValidationRule>>();
+
+type ParsedCriteria = Pick<
+  AcceptanceCriteria,
+  "rules" | "correctPatterns" | "incorrectPatterns"
+>;
+
+/**
+ * Split markdown into `## ` sections, returning each title and body.
+ */
+function splitSections(content: string): Array<{ title: string; body: string }> {
+  const sections: Array<{ title: string; body: string }> = [];
+
+  for (const section of content.split(SECTION_SPLIT_REGEX)) {
+    if (!section.trim()) {
+      continue;
+    }
+
+    // Section title is the first line
+    const newline = section.indexOf("\n");
+    const title = (newline === -1 ? section : section.slice(0, newline)).trim();
+    const body = newline === -1 ? "" : section.slice(newline + 1);
+    sections.push({ title, body });
+  }
+
+  return sections;
+}
+
 // =============================================================================
 // AcceptanceCriteriaLoader
 // =============================================================================
@@ -61,28 +110,22 @@ export class AcceptanceCriteriaLoader {
    * List all skills that have acceptance criteria.
    */
   listSkillsWithCriteria(): string[] {
-    const skills: string[] = [];
-
     if (!existsSync(this.skillsDir)) {
-      return skills;
-    }
-
-    const entries = readdirSync(this.skillsDir, { withFileTypes: true });
-
-    for (const entry of entries) {
-      if (entry.isDirectory() || entry.isSymbolicLink()) {
-        const criteriaPath = join(
-          this.skillsDir,
-          entry.name,
-          CRITERIA_FILENAME
-        );
-        if (existsSync(criteriaPath)) {
-          skills.push(entry.name);
-        }
-      }
+      return [];
     }
 
-    return skills.sort();
+    // Dirent type comes from the directory read itself, so only the
+    // criteria file costs a stat per skill. Symlinked skills are kept.
+    return readdirSync(this.skillsDir, { withFileTypes: true })
+      .filter(
+        (entry) =>
+          (entry.isDirectory() || entry.isSymbolicLink()) &&
+          statSync(join(this.skillsDir, entry.name, CRITERIA_FILENAME), {
+            throwIfNoEntry: false,
+          })?.isFile() === true
+      )
+      .map((entry) => entry.name)
+      .sort();
   }
 
   /**
@@ -90,13 +133,33 @@ export class AcceptanceCriteriaLoader {
    */
   load(skillName: string): AcceptanceCriteria {
     const criteriaPath = join(this.skillsDir, skillName, CRITERIA_FILENAME);
+    const stat = statSync(criteriaPath, { throwIfNoEntry: false });
 
-    if (!existsSync(criteriaPath)) {
+    if (!stat) {
       throw new Error(`Acceptance criteria not found: ${criteriaPath}`);
     }
 
+    const cacheKey = `${resolve(criteriaPath)}\0${stat.mtimeMs}\0${stat.size}`;
+    const cached = criteriaCache.get(cacheKey);
+    if (cached) {
+      // Refresh recency
+      criteriaCache.delete(cacheKey);
+      criteriaCache.set(cacheKey, cached);
+      return cached;
+    }
+
     const content = readFileSync(criteriaPath, "utf-8");
-    return this.parseCriteria(skillName, criteriaPath, content);
+    const criteria = this.parseCriteria(skillName, criteriaPath, content);
+
+    criteriaCache.set(cacheKey, criteria);
+    if (criteriaCache.size > CRITERIA_CACHE_SIZE) {
+      const oldest = criteriaCache.keys().next().value;
+      if (oldest !== undefined) {
+        criteriaCache.delete(oldest);
+      }
+    }
+
+    return criteria;
   }
 
   /**
@@ -107,91 +170,91 @@ export class AcceptanceCriteriaLoader {
     sourcePath: string,
     content: string
   ): AcceptanceCriteria {
-    const language = detectLanguage(skillName);
-
-    const criteria = createAcceptanceCriteria({
+    return createAcceptanceCriteria({
       skillName,
       sourcePath,
-      language,
+      language: detectLanguage(skillName),
+      ...this.parseSections(content),
     });
-
-    // Extract all code blocks with context
-    for (const pattern of this.extractCodePatterns(content)) {
-      if (pattern.isCorrect) {
-        criteria.correctPatterns.push(pattern);
-      } else {
-        criteria.incorrectPatterns.push(pattern);
-      }
-    }
-
-    // Extract validation rules from sections
-    criteria.rules = Array.from(this.extractRules(content));
-
-    return criteria;
   }
 
   /**
-   * Extract code blocks with their context (correct/incorrect).
+   * Parse all sections into rules and the flat pattern lists.
    */
-  private *extractCodePatterns(content: string): Generator<CodePattern> {
-    // Split by sections (## headers)
-    const sections = content.split(/^## /m);
-
-    for (const section of sections) {
-      if (!section.trim()) {
-        continue;
+  private parseSections(content: string): ParsedCriteria {
+    const parsed: ParsedCriteria = {
+      rules: [],
+      correctPatterns: [],
+      incorrectPatterns: [],
+    };
+
+    // Split once; both the global pattern lists and the per-rule patterns
+    // are built from the same pass over the sections
+    for (const { title, body } of splitSections(content)) {
+      const patterns = this.patternsInSection(title, body);
+
+      for (const pattern of patterns) {
+        if (pattern.isCorrect) {
+          parsed.correctPatterns.push(pattern);
+        } else {
+          parsed.incorrectPatterns.push(pattern);
+        }
       }
 
-      // Get section title (first line)
-      const lines = section.split("\n");
-      const sectionTitle = lines[0]?.trim() ?? "";
-      const sectionContent = lines.slice(1).join("\n");
-
-      // Determine if this section contains correct or incorrect examples
-      const isCorrectSection = this.isCorrectSection(sectionContent);
-
-      // Extract code blocks: ```lang\ncode\n```
-      const codeBlockRegex = /```(\w+)?\n([\s\S]*?)```/g;
-      let match: RegExpExecArray | null;
-
-      while ((match = codeBlockRegex.exec(sectionContent)) !== null) {
-        const lang = match[1] ?? "python";
-        const code = match[2]?.trim() ?? "";
+      const rule = this.buildRule(title, body, patterns);
+      if (rule) {
+        parsed.rules.push(rule);
+      }
+    }
 
-        // Check surrounding context for correct/incorrect markers
-        const isCorrect = this.determineCorrectness(
-          code,
-          sectionContent,
-          isCorrectSection
-        );
+    return parsed;
+  }
 
-        yield createCodePattern({
+  /**
+   * Extract code blocks with their context (correct/incorrect) from one section.
+   */
+  private patternsInSection(sectionTitle: string, sectionContent: string): CodePattern[] {
+    const patterns: CodePattern[] = [];
+
+    // Determine if this section contains correct or incorrect examples
+    const isCorrectSection = this.isCorrectSection(sectionContent);
+
+    // Extract code blocks: ```lang\ncode\n```
+    for (const match of sectionContent.matchAll(CODE_BLOCK_REGEX)) {
+      const lang = match[1] ?? "python";
+      const body = match[2] ?? "";
+      const code = body.trim();
+
+      // Offset of the code itself (past the fence line and leading
+      // whitespace), so the marker window ends where the snippet starts
+      const codeStart =
+        (match.index ?? 0) +
+        match[0].indexOf("\n") +
+        1 +
+        (body.length - body.trimStart().length);
+
+      // Check surrounding context for correct/incorrect markers
+      const isCorrect = this.determineCorrectness(codeStart, sectionContent, isCorrectSection);
+
+      patterns.push(
+        createCodePattern({
           code,
           language: lang as Language,
           isCorrect,
           section: sectionTitle,
-        });
-      }
+        })
+      );
     }
+
+    return patterns;
   }
 
   /**
    * Determine if section primarily contains correct examples.
    */
   private isCorrectSection(content: string): boolean | null {
-    const correctMarkers = ["✅", "Correct", "DO:", "Good"];
-    const incorrectMarkers = ["❌", "Incorrect", "DON'T:", "Bad", "Anti-pattern"];
-
-    let correctCount = 0;
-    let incorrectCount = 0;
-
-    for (const marker of correctMarkers) {
-      correctCount += (content.match(new RegExp(marker, "g")) ?? []).length;
-    }
-
-    for (const marker of incorrectMarkers) {
-      incorrectCount += (content.match(new RegExp(marker, "g")) ?? []).length;
-    }
+    const correctCount = content.match(CORRECT_MARKER_REGEX)?.length ?? 0;
+    const incorrectCount = content.match(INCORRECT_MARKER_REGEX)?.length ?? 0;
 
     if (correctCount > incorrectCount) {
       return true;
@@ -205,20 +268,12 @@ export class AcceptanceCriteriaLoader {
    * Determine if a specific code block is correct or incorrect.
    */
   private determineCorrectness(
-    code: string,
+    start: number,
     context: string,
     sectionDefault: boolean | null
   ): boolean {
-    // Find the position of this code in the context
-    const searchCode = code.length > 50 ? code.slice(0, 50) : code;
-    const codePos = context.indexOf(searchCode);
-
-    if (codePos === -1) {
-      return sectionDefault ?? true;
-    }
-
     // Look at the 200 characters before the code block
-    const preceding = context.slice(Math.max(0, codePos - 200), codePos);
+    const preceding = context.slice(Math.max(0, start - 200), start);
 
     // Check for markers
     if (
@@ -236,70 +291,57 @@ export class AcceptanceCriteriaLoader {
   }
 
   /**
-   * Extract structured validation rules from content.
+   * Build the validation rule for a section, or null if it has no examples.
    */
-  private *extractRules(content: string): Generator<ValidationRule> {
-    // Split by sections (## headers)
-    const sections = content.split(/^## /m);
-
-    for (const section of sections) {
-      if (!section.trim()) {
-        continue;
-      }
-
-      const lines = section.split("\n");
-      const title = lines[0]?.trim() ?? "";
-      const body = lines.slice(1).join("\n");
+  private buildRule(
+    title: string,
+    body: string,
+    patterns: CodePattern[]
+  ): ValidationRule | null {
+    // Skip non-rule sections
+    const lowerTitle = title.toLowerCase();
+    if (SKIP_RULE_KEYWORDS.some((kw) => lowerTitle.includes(kw))) {
+      return null;
+    }
 
-      // Skip non-rule sections
-      const skipKeywords = ["overview", "introduction", "quick reference"];
-      if (skipKeywords.some((kw) => title.toLowerCase().includes(kw))) {
-        continue;
-      }
+    if (patterns.length === 0) {
+      return null;
+    }
 
-      const rule = createValidationRule({
-        name: title,
-        description: this.extractDescription(body),
-      });
+    const rule = createValidationRule({
+      name: title,
+      description: this.extractDescription(body),
+    });
 
-      // Extract patterns for this rule
-      for (const pattern of this.extractCodePatterns(`## ${section}`)) {
-        if (pattern.isCorrect) {
-          rule.correctPatterns.push(pattern);
-        } else {
-          rule.incorrectPatterns.push(pattern);
-        }
+    for (const pattern of patterns) {
+      if (pattern.isCorrect) {
+        rule.correctPatterns.push(pattern);
+      } else {
+        rule.incorrectPatterns.push(pattern);
       }
+    }
 
-      // Extract import requirements
-      rule.requiredImports = this.extractRequiredImports(body);
-      rule.forbiddenImports = this.extractForbiddenImports(body);
+    // Extract import requirements
+    rule.requiredImports = this.extractRequiredImports(body);
+    rule.forbiddenImports = this.extractForbiddenImports(body);
 
-      if (rule.correctPatterns.length > 0 || rule.incorrectPatterns.length > 0) {
-        yield rule;
-      }
-    }
+    return rule;
   }
 
   /**
    * Extract the description (first paragraph) from content.
    */
   private extractDescription(content: string): string {
-    const lines: string[] = [];
-
-    for (const line of content.split("\n")) {
-      if (line.startsWith("#") || line.startsWith("```")) {
-        break;
-      }
-      if (line.trim()) {
-        lines.push(line.trim());
-      } else if (lines.length > 0) {
-        // Empty line after content
-        break;
-      }
+    const match = DESCRIPTION_REGEX.exec(content);
+    if (!match?.[1]) {
+      return "";
     }
 
-    return lines.join(" ");
+    return match[1]
+      .split("\n")
+      .map((line) => line.trim())
+      .filter(Boolean)
+      .join(" ");
   }
 
   /**
@@ -308,10 +350,7 @@ export class AcceptanceCriteriaLoader {
   private extractRequiredImports(content: string): string[] {
     const imports: string[] = [];
     // Look for patterns like "from module import name"
-    const importPattern = /from\s+([\w.]+)\s+import\s+([\w,\s]+)/g;
-    let match: RegExpExecArray | null;
-
-    while ((match = importPattern.exec(content)) !== null) {
+    for (const match of content.matchAll(IMPORT_REGEX)) {
       const module = match[1];
       const names = match[2]?.split(",").map((n) => n.trim()) ?? [];
       for (const name of names) {
@@ -346,9 +385,22 @@ export function getRule(
   criteria: AcceptanceCriteria,
   name: string
 ): ValidationRule | undefined {
-  return criteria.rules.find(
-    (rule) => rule.name.toLowerCase() === name.toLowerCase()
-  );
+  const rules = criteria.rules;
+  let index = ruleIndexCache.get(rules);
+
+  if (!index) {
+    index = new Map();
+    for (const rule of rules) {
+      const key = rule.name.toLowerCase();
+      // Keep the first match, as a linear find would
+      if (!index.has(key)) {
+        index.set(key, rule);
+      }
+    }
+    ruleIndexCache.set(rules, index);
+  }
+
+  return index.get(name.toLowerCase());
 }
 
 /**
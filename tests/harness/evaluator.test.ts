@@ -0,0 +1,281 @@
+/**
+ * Tests for CodeEvaluator
+ *
+ * Validates how criteria snippets are turned into matchers (quote and
+ * whitespace handling, escaping), the anchor prefilter that picks which
+ * patterns to verify, flexible line matching for correct patterns, and the
+ * result reported for code that fails the syntax check.
+ */
+
+import { describe, it, expect } from "vitest";
+import { CodeEvaluator } from "./evaluator.js";
+import {
+  Severity,
+  type AcceptanceCriteria,
+  createAcceptanceCriteria,
+  createCodePattern,
+} from "./types.js";
+
+// =============================================================================
+// Helpers
+// =============================================================================
+
+/**
+ * Criteria with a single incorrect pattern, which is only ever matched by
+ * its regex (there is no flexible fallback for incorrect patterns).
+ */
+function incorrectCriteria(code: string, section = "Anti-pattern"): AcceptanceCriteria {
+  return createAcceptanceCriteria({
+    skillName: "test-skill-py",
+    incorrectPatterns: [createCodePattern({ code, isCorrect: false, section })],
+  });
+}
+
+function matchedIncorrect(criteria: AcceptanceCriteria, code: string): string[] {
+  return new CodeEvaluator(criteria).evaluate(code).matchedIncorrect;
+}
+
+/**
+ * Criteria with incorrect patterns keyed by section name.
+ */
+function incorrectCriteriaFor(patterns: Record<string, string>): AcceptanceCriteria {
+  return createAcceptanceCriteria({
+    skillName: "test-skill-py",
+    incorrectPatterns: Object.entries(patterns).map(([section, code]) =>
+      createCodePattern({ code, isCorrect: false, section })
+    ),
+  });
+}
+
+/**
+ * Criteria with a single correct pattern.
+ */
+function correctCriteria(code: string, section = "Usage"): AcceptanceCriteria {
+  return createAcceptanceCriteria({
+    skillName: "test-skill-py",
+    correctPatterns: [createCodePattern({ code, isCorrect: true, section })],
+  });
+}
+
+function matchedCorrect(criteria: AcceptanceCriteria, code: string): string[] {
+  return new CodeEvaluator(criteria).evaluate(code).matchedCorrect;
+}
+
+// =============================================================================
+// Snippet Regexes
+// =============================================================================
+
+describe("CodeEvaluator", () => {
+  describe("snippet regexes", () => {
+    it("matches single-quoted snippets with either quote style", () => {
+      const criteria = incorrectCriteria("client = SearchClient(endpoint, 'index')");
+
+      expect(matchedIncorrect(criteria, "client = SearchClient(endpoint, 'index')")).toEqual([
+        "Anti-pattern",
+      ]);
+      expect(matchedIncorrect(criteria, 'client = SearchClient(endpoint, "index")')).toEqual([
+        "Anti-pattern",
+      ]);
+    });
+
+    it("turns a double quote into a class followed by a literal bracket", () => {
+      // '"' becomes ["["']] (the "'" rewrite also applies inside the class
+      // emitted for '"'), so double-quoted snippets never match themselves
+      const criteria = incorrectCriteria('client = SearchClient(endpoint, "index")');
+
+      expect(matchedIncorrect(criteria, 'client = SearchClient(endpoint, "index")')).toEqual([]);
+      expect(matchedIncorrect(criteria, "client = SearchClient(endpoint, 'index')")).toEqual([]);
+      expect(matchedIncorrect(criteria, "client = SearchClient(endpoint, []index[])")).toEqual([
+        "Anti-pattern",
+      ]);
+    });
+
+    it("turns a backslash-n into a backslash followed by optional s", () => {
+      const criteria = incorrectCriteria("lines = text.split('\\n')");
+
+      expect(matchedIncorrect(criteria, "lines = text.split('\\n')")).toEqual([]);
+      expect(matchedIncorrect(criteria, "lines = text.split('\\')")).toEqual(["Anti-pattern"]);
+      expect(matchedIncorrect(criteria, "lines = text.split('\\ss')")).toEqual(["Anti-pattern"]);
+    });
+
+    it("allows any whitespace where the snippet has spaces", () => {
+      const criteria = incorrectCriteria("result = client.get(key)");
+
+      expect(matchedIncorrect(criteria, "result  =\tclient.get(key)")).toEqual(["Anti-pattern"]);
+      expect(matchedIncorrect(criteria, "result=client.get(key)")).toEqual([]);
+    });
+
+    it("escapes regex metacharacters", () => {
+      const criteria = incorrectCriteria("items = [x.id for x in list(y)]");
+
+      expect(matchedIncorrect(criteria, "items = [x.id for x in list(y)]")).toEqual([
+        "Anti-pattern",
+      ]);
+      expect(matchedIncorrect(criteria, "items = [xaid for x in list(y)]")).toEqual([]);
+    });
+  });
+
+  // ===========================================================================
+  // Anchor Prefilter
+  // ===========================================================================
+
+  describe("anchor prefilter", () => {
+    const criteria = incorrectCriteriaFor({
+      "Sync Credential": "credential = DefaultAzureCredential()",
+      "Missing Close": "client.close()",
+      "Blocking Poll": "result = poller.result(timeout=None)",
+    });
+
+    it("reports only patterns present in the code, in criteria order", () => {
+      const code = [
+        "result = poller.result(timeout=None)",
+        "credential = DefaultAzureCredential()",
+      ].join("\n");
+
+      expect(matchedIncorrect(criteria, code)).toEqual(["Sync Credential", "Blocking Poll"]);
+    });
+
+    it("requires the full regex match, not just the anchor", () => {
+      // "poller.result(timeout=None)" is the anchor, but the assignment is missing
+      expect(matchedIncorrect(criteria, "poller.result(timeout=None)")).toEqual([]);
+    });
+
+    it("reports patterns whose anchors are nested in another match", () => {
+      const nested = incorrectCriteriaFor({
+        "Close": "close()",
+        "Client Close": "client.close()",
+      });
+
+      expect(matchedIncorrect(nested, "client.close()")).toEqual(["Close", "Client Close"]);
+    });
+
+    it("always verifies patterns without a literal anchor", () => {
+      // Nothing but quotes: no literal run to index, the regex alone decides
+      const unanchored = incorrectCriteria("''");
+
+      expect(matchedIncorrect(unanchored, "name = ''")).toEqual(["Anti-pattern"]);
+      expect(matchedIncorrect(unanchored, "name = None")).toEqual([]);
+    });
+
+    it("gives the same results from a second evaluator for the same criteria", () => {
+      const code = "client.close()";
+      expect(matchedIncorrect(criteria, code)).toEqual(["Missing Close"]);
+      expect(matchedIncorrect(criteria, code)).toEqual(["Missing Close"]);
+    });
+
+    it("sees patterns added to criteria after an evaluator was built", () => {
+      const growing = incorrectCriteria("client.close()", "Missing Close");
+      expect(matchedIncorrect(growing, "credential = DefaultAzureCredential()")).toEqual([]);
+
+      growing.incorrectPatterns.push(
+        createCodePattern({
+          code: "credential = DefaultAzureCredential()",
+          isCorrect: false,
+          section: "Sync Credential",
+        })
+      );
+
+      expect(matchedIncorrect(growing, "credential = DefaultAzureCredential()")).toEqual([
+        "Sync Credential",
+      ]);
+    });
+  });
+
+  // ===========================================================================
+  // Literal Patterns
+  // ===========================================================================
+
+  describe("literal patterns", () => {
+    it("matches a snippet with no whitespace or quotes as a plain substring", () => {
+      const criteria = incorrectCriteria("client.begin_create_or_update(rg,name,params)");
+
+      expect(
+        matchedIncorrect(criteria, "poller = client.begin_create_or_update(rg,name,params)")
+      ).toEqual(["Anti-pattern"]);
+    });
+
+    it("does not match near misses of a literal snippet", () => {
+      const criteria = incorrectCriteria("client.begin_create_or_update(rg,name,params)");
+
+      expect(matchedIncorrect(criteria, "client.begin_create_or_update(rg, name, params)")).toEqual(
+        []
+      );
+      expect(matchedIncorrect(criteria, "client.begin_create_or_update(rg,name)")).toEqual([]);
+    });
+  });
+
+  // ===========================================================================
+  // Flexible Matching
+  // ===========================================================================
+
+  describe("flexible matching", () => {
+    const pattern = [
+      "client = SearchClient(endpoint, index_name, credential)",
+      'results = client.search(search_text=query)  # top 50 by default',
+    ].join("\n");
+
+    it("matches when code lines contain the pattern lines", () => {
+      const code = [
+        "client = SearchClient(endpoint, index_name, credential)",
+        'print(query)',
+        'results = client.search(search_text=query)  # top 50 by default',
+      ].join("\n");
+
+      expect(matchedCorrect(correctCriteria(pattern), code)).toEqual(["Usage"]);
+    });
+
+    it("matches when pattern lines contain the code lines", () => {
+      // The code drops the trailing comment, so only the pattern line
+      // contains the code line
+      const code = [
+        "client  =  SearchClient(endpoint, index_name, credential)",
+        'results = client.search(search_text=query)',
+      ].join("\n");
+
+      expect(matchedCorrect(correctCriteria(pattern), code)).toEqual(["Usage"]);
+    });
+
+    it("requires every significant line of a short pattern", () => {
+      const code = "client = SearchClient(endpoint, index_name, credential)";
+
+      expect(matchedCorrect(correctCriteria(pattern), code)).toEqual([]);
+    });
+
+    it("accepts two matching lines of a longer pattern", () => {
+      const longPattern = [
+        "credential = DefaultAzureCredential()",
+        "client = SearchClient(endpoint, index_name, credential)",
+        'results = client.search(search_text=query)',
+      ].join("\n");
+      const code = [
+        "credential = DefaultAzureCredential()",
+        'results = client.search(search_text=query)',
+      ].join("\n");
+
+      expect(matchedCorrect(correctCriteria(longPattern), code)).toEqual(["Usage"]);
+    });
+  });
+
+  // ===========================================================================
+  // Syntax Errors
+  // ===========================================================================
+
+  describe("syntax errors", () => {
+    it("fails the result with a single syntax error and a zero score", () => {
+      const criteria = correctCriteria("client = SearchClient(endpoint, index_name, credential)");
+
+      const result = new CodeEvaluator(criteria).evaluate(
+        "client = SearchClient(endpoint, index_name, credential"
+      );
+
+      expect(result.passed).toBe(false);
+      expect(result.errorCount).toBe(1);
+      expect(result.warningCount).toBe(0);
+      expect(result.score).toBe(0);
+      expect(result.findings).toHaveLength(1);
+      expect(result.findings[0]?.rule).toBe("syntax");
+      expect(result.findings[0]?.severity).toBe(Severity.ERROR);
+      expect(result.matchedCorrect).toEqual([]);
+    });
+  });
+});
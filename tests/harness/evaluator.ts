@@ -14,6 +14,7 @@ import type {
   ValidationRule,
 } from "./types.js";
 import { Severity, createEvaluationResult, createFinding } from "./types.js";
+import { AhoCorasick } from "./aho-corasick.js";
 
 // =============================================================================
 // Types
@@ -21,7 +22,310 @@ import { Severity, createEvaluationResult, createFinding } from "./types.js";
 
 interface CompiledPattern {
   section: string;
-  regex: RegExp;
+  /** Regex source from codeToRegex */
+  source: string;
+  /** Compiled on first verification; undefined until then, null if invalid */
+  regex: RegExp | null | undefined;
+  /** Longest literal run every regex match must contain ("" if none) */
+  anchor: string;
+  /** The snippet has nothing flexible, so an anchor hit is a full match */
+  literal: boolean;
+}
+
+/**
+ * Multi-pattern prefilter over a list of compiled patterns.
+ */
+interface PatternIndex {
+  /** Anchor -> index into the compiled pattern list */
+  automaton: AhoCorasick<number>;
+  /** Patterns with no usable anchor; always verified */
+  unanchored: number[];
+}
+
+/**
+ * Significant (>= 15 chars) lines of a pattern, whitespace-normalized.
+ */
+interface PreparedLines {
+  normalized: string[];
+  /** Lines of at least 15 chars before normalization; all must match */
+  significantCount: number;
+}
+
+/**
+ * Pattern-side line preprocessing, computed once per criteria pattern.
+ */
+interface PreparedPattern {
+  lineCount: number;
+  /** Whitespace-normalized "from"/"import" lines */
+  imports: string[];
+  nonImportLineCount: number;
+  nonImportLines: PreparedLines;
+  allLines: PreparedLines;
+}
+
+/**
+ * Per-evaluation view of the generated code, built once in evaluate().
+ */
+interface CodeIndex {
+  code: string;
+  imports: ReadonlySet<string>;
+  /** Trimmed, whitespace-normalized, non-comment lines */
+  lines: string[];
+  lineSet: ReadonlySet<string>;
+  /** Flexible pattern lines matched by some code line; filled on first use */
+  flexibleHits: ReadonlySet<string> | null;
+  /** Rule required patterns present in the code; filled on first use */
+  requiredFound: ReadonlySet<string> | null;
+}
+
+/**
+ * An import-only incorrect pattern, flagged when all its imports co-occur.
+ */
+interface ImportCombination {
+  section: string;
+  imports: string[];
+}
+
+/**
+ * Everything CodeEvaluator derives from its criteria, shared by all
+ * evaluators built from criteria with the same content.
+ */
+interface CompiledCriteria {
+  correctRegexes: CompiledPattern[];
+  incorrectRegexes: CompiledPattern[];
+  correctIndex: PatternIndex;
+  incorrectIndex: PatternIndex;
+  preparedPatterns: Map<string, PreparedPattern>;
+  incorrectImportCombinations: ImportCombination[];
+  flexibleLines: string[];
+  flexibleLineIndex: AhoCorasick<string>;
+  requiredPatternIndex: AhoCorasick<string>;
+}
+
+// Characters codeToRegex turns into flexible matches (whitespace, quotes and
+// escaped "\n"); the runs between them are matched literally
+const LITERAL_BREAK_REGEX = /\s+|["']|\\n/;
+
+// Everything codeToRegex rewrites, matched in one scan: escaped "\n", regex
+// specials, runs of spaces and string quotes
+const CODE_TRANSFORM_REGEX = /\\n|[.*+?^${}()|[\]\\]| +|["']/g;
+
+// Per-token output of the former escape-then-replace chain, which also
+// rewrote the "'" inside the class it had emitted for '"'
+const CODE_TRANSFORMS: Readonly<Record<string, string>> = {
+  "\\n": "\\\\s*",
+  '"': '["["\']]',
+  "'": '["\']',
+};
+
+// Python import statements, one per line
+const FROM_IMPORT_REGEX = /^from\s+([\w.]+)\s+import\s+(.+)$/gm;
+const IMPORT_REGEX = /^import\s+(.+)$/gm;
+
+const NO_IMPORTS: ReadonlySet<string> = new Set();
+const IMPORT_CACHE_SIZE = 256;
+const importCache = new Map<string, ReadonlySet<string>>();
+
+const COMPILED_CACHE_SIZE = 64;
+
+const REGEX_CACHE_SIZE = 4096;
+const regexSourceCache = new Map<string, string>();
+const compiledRegexCache = new Map<string, RegExp | null>();
+
+function isImportLine(line: string): boolean {
+  return line.startsWith("from ") || line.startsWith("import ");
+}
+
+function normalizeWhitespace(line: string): string {
+  return line.split(/\s+/).join(" ");
+}
+
+/**
+ * Extract normalized Python import statements, memoized by code.
+ *
+ * The regexes are anchored at column 0, so only module-level imports are
+ * read. The same sample is often evaluated against several criteria, so the
+ * result is cached across evaluators.
+ */
+function extractPythonImports(code: string): ReadonlySet<string> {
+  const cached = importCache.get(code);
+  if (cached) {
+    return cached;
+  }
+
+  const actualImports = new Set<string>();
+
+  for (const match of code.matchAll(FROM_IMPORT_REGEX)) {
+    const module = match[1];
+    const names = match[2]?.split(",").map((n) => n.trim()) ?? [];
+    for (const name of names) {
+      // Remove any "as alias" parts
+      const cleanName = name.split(/\s+as\s+/)[0]?.trim();
+      if (cleanName && module) {
+        actualImports.add(`from ${module} import ${cleanName}`);
+      }
+    }
+  }
+
+  for (const match of code.matchAll(IMPORT_REGEX)) {
+    const names = match[1]?.split(",").map((n) => n.trim()) ?? [];
+    for (const name of names) {
+      const cleanName = name.split(/\s+as\s+/)[0]?.trim();
+      if (cleanName) {
+        actualImports.add(`import ${cleanName}`);
+      }
+    }
+  }
+
+  setBounded(importCache, code, actualImports, IMPORT_CACHE_SIZE);
+  return actualImports;
+}
+
+/**
+ * Convert a code snippet to the source of a flexible regex pattern.
+ *
+ * Cached by snippet, since the same criteria patterns recur across skills
+ * and evaluator instances.
+ */
+function codeToRegex(code: string): string {
+  const cached = regexSourceCache.get(code);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  // Escape special regex chars, make whitespace and string quotes flexible
+  const pattern = code.trim().replace(CODE_TRANSFORM_REGEX, (token) => {
+    const transformed = CODE_TRANSFORMS[token];
+    if (transformed !== undefined) {
+      return transformed;
+    }
+    return token.startsWith(" ") ? "\\s+" : `\\${token}`;
+  });
+
+  setBounded(regexSourceCache, code, pattern, REGEX_CACHE_SIZE);
+  return pattern;
+}
+
+/**
+ * Compile a codeToRegex source, shared across evaluators; null if invalid.
+ *
+ * The flags carry no "g", so the RegExp holds no lastIndex state and is
+ * safe to share.
+ */
+function compileRegex(source: string): RegExp | null {
+  let regex = compiledRegexCache.get(source);
+  if (regex === undefined) {
+    try {
+      regex = new RegExp(source, "ms"); // multiline, dotall
+    } catch {
+      regex = null;
+    }
+    setBounded(compiledRegexCache, source, regex, REGEX_CACHE_SIZE);
+  }
+  return regex;
+}
+
+/**
+ * Insert into a cache Map, evicting the oldest entry past the limit.
+ */
+function setBounded<K, V>(cache: Map<K, V>, key: K, value: V, limit: number): void {
+  cache.set(key, value);
+  if (cache.size > limit) {
+    const oldest = cache.keys().next().value;
+    if (oldest !== undefined) {
+      cache.delete(oldest);
+    }
+  }
+}
+
+/**
+ * Trimmed, whitespace-normalized, non-comment lines of generated code.
+ */
+function normalizeCodeLines(code: string): string[] {
+  return code
+    .split("\n")
+    .map((line) => line.trim())
+    .filter((line) => line && !line.startsWith("#"))
+    .map(normalizeWhitespace);
+}
+
+function prepareLines(lines: string[]): PreparedLines {
+  return {
+    normalized: lines.map(normalizeWhitespace).filter((l) => l.length >= 15),
+    significantCount: lines.filter((l) => l.length >= 15).length,
+  };
+}
+
+/**
+ * Split a pattern into trimmed, non-comment lines grouped for matching.
+ */
+function preparePattern(code: string): PreparedPattern {
+  const lines = code
+    .trim()
+    .split("\n")
+    .map((line) => line.trim())
+    .filter((line) => line && !line.startsWith("#"));
+  const importLines = lines.filter(isImportLine);
+  const nonImportLines = lines.filter((line) => !isImportLine(line));
+
+  return {
+    lineCount: lines.length,
+    imports: importLines.map(normalizeWhitespace),
+    nonImportLineCount: nonImportLines.length,
+    nonImportLines: prepareLines(nonImportLines),
+    allLines: prepareLines(lines),
+  };
+}
+
+/**
+ * Longest literal substring that any match of codeToRegex(code) must contain.
+ */
+function literalAnchor(code: string): string {
+  let anchor = "";
+  for (const token of code.trim().split(LITERAL_BREAK_REGEX)) {
+    if (token.length > anchor.length) {
+      anchor = token;
+    }
+  }
+  return anchor;
+}
+
+/**
+ * Preprocessed lines for a pattern's code, computed on first use.
+ */
+function preparedPatternFor(cache: Map<string, PreparedPattern>, code: string): PreparedPattern {
+  let prepared = cache.get(code);
+  if (!prepared) {
+    prepared = preparePattern(code);
+    cache.set(code, prepared);
+  }
+  return prepared;
+}
+
+/**
+ * Key for the criteria content compiled state is derived from: pattern
+ * code and sections, and each rule's required patterns.
+ */
+function compiledCriteriaKey(criteria: AcceptanceCriteria): string {
+  return JSON.stringify([
+    criteria.correctPatterns.map((pattern) => [pattern.section, pattern.code]),
+    criteria.incorrectPatterns.map((pattern) => [pattern.section, pattern.code]),
+    criteria.rules.map((rule) => rule.requiredPatterns),
+  ]);
+}
+
+/**
+ * Pattern-side regex state; the regex itself is compiled on first use.
+ */
+function compilePattern(pattern: CodePattern): CompiledPattern {
+  const anchor = literalAnchor(pattern.code);
+  return {
+    section: pattern.section,
+    source: codeToRegex(pattern.code),
+    regex: undefined,
+    anchor,
+    literal: anchor !== "" && anchor === pattern.code.trim(),
+  };
 }
 
 // =============================================================================
@@ -38,64 +342,166 @@ interface CompiledPattern {
  * - Best practice checks
  */
 export class CodeEvaluator {
+  // Compiled state only grows lazily (regexes, prepared lines) and never
+  // changes meaning, so evaluators share it. It is keyed by criteria
+  // content rather than object identity: criteria are plain mutable
+  // objects, and a changed object must not be evaluated with stale state.
+  private static readonly compiledCache = new Map<string, CompiledCriteria>();
+
   private readonly criteria: AcceptanceCriteria;
-  private correctRegexes: CompiledPattern[] = [];
-  private incorrectRegexes: CompiledPattern[] = [];
+  private readonly compiled: CompiledCriteria;
 
   constructor(criteria: AcceptanceCriteria) {
     this.criteria = criteria;
-    this.compilePatterns();
+
+    const key = compiledCriteriaKey(criteria);
+    let compiled = CodeEvaluator.compiledCache.get(key);
+    if (!compiled) {
+      compiled = this.compilePatterns();
+      setBounded(CodeEvaluator.compiledCache, key, compiled, COMPILED_CACHE_SIZE);
+    }
+    this.compiled = compiled;
   }
 
   /**
    * Pre-compile regex patterns for efficiency.
    */
-  private compilePatterns(): void {
-    this.correctRegexes = [];
-    this.incorrectRegexes = [];
+  private compilePatterns(): CompiledCriteria {
+    const correctRegexes: CompiledPattern[] = [];
+    const incorrectRegexes: CompiledPattern[] = [];
 
+    // Regexes are compiled lazily: most patterns are ruled out by the anchor
+    // prefilter and never need one
     for (const pattern of this.criteria.correctPatterns) {
-      const regex = this.codeToRegex(pattern.code);
-      if (regex) {
-        this.correctRegexes.push({ section: pattern.section, regex });
+      correctRegexes.push(compilePattern(pattern));
+    }
+
+    for (const pattern of this.criteria.incorrectPatterns) {
+      incorrectRegexes.push(compilePattern(pattern));
+    }
+
+    // Line-level preprocessing for patternMatches and checkImports
+    const preparedPatterns = new Map<string, PreparedPattern>();
+    const patterns = [
+      ...this.criteria.correctPatterns,
+      ...this.criteria.incorrectPatterns,
+      ...this.criteria.rules.flatMap((rule) => rule.incorrectPatterns),
+    ];
+    for (const pattern of patterns) {
+      preparedPatternFor(preparedPatterns, pattern.code);
+    }
+
+    // Every normalized line the flexible matcher may look for (it only runs
+    // on correct patterns), in one automaton so all code lines can be
+    // checked in a single pass
+    const flexibleLines = new Set<string>();
+    for (const pattern of this.criteria.correctPatterns) {
+      const prepared = preparedPatternFor(preparedPatterns, pattern.code);
+      for (const line of [...prepared.nonImportLines.normalized, ...prepared.allLines.normalized]) {
+        flexibleLines.add(line);
+      }
+    }
+    const flexibleLineIndex = new AhoCorasick<string>();
+    for (const line of flexibleLines) {
+      flexibleLineIndex.add(line, line);
+    }
+
+    // Required patterns of every rule are exact substrings, so one scan of the
+    // code answers all of them
+    const requiredPatternIndex = new AhoCorasick<string>();
+    for (const rule of this.criteria.rules) {
+      for (const reqPattern of rule.requiredPatterns) {
+        if (reqPattern) {
+          requiredPatternIndex.add(reqPattern, reqPattern);
+        }
       }
     }
 
+    // Only import-only incorrect patterns are checked by checkImports; mixed
+    // patterns (import + misuse) are handled by patternMatches()
+    const incorrectImportCombinations: ImportCombination[] = [];
     for (const pattern of this.criteria.incorrectPatterns) {
-      const regex = this.codeToRegex(pattern.code);
-      if (regex) {
-        this.incorrectRegexes.push({ section: pattern.section, regex });
+      if (!pattern.code.toLowerCase().includes("import")) {
+        continue;
+      }
+      const prepared = preparedPatternFor(preparedPatterns, pattern.code);
+      if (prepared.imports.length > 0 && prepared.nonImportLineCount === 0) {
+        incorrectImportCombinations.push({
+          section: pattern.section,
+          imports: prepared.imports,
+        });
       }
     }
+
+    return {
+      correctRegexes,
+      incorrectRegexes,
+      correctIndex: this.buildPatternIndex(correctRegexes),
+      incorrectIndex: this.buildPatternIndex(incorrectRegexes),
+      preparedPatterns,
+      incorrectImportCombinations,
+      flexibleLines: [...flexibleLines],
+      flexibleLineIndex,
+      requiredPatternIndex,
+    };
+  }
+
+  /**
+   * Preprocessed lines for a pattern, computed on first use.
+   */
+  private getPreparedPattern(pattern: CodePattern): PreparedPattern {
+    return preparedPatternFor(this.compiled.preparedPatterns, pattern.code);
   }
 
   /**
-   * Convert a code snippet to a flexible regex pattern.
+   * Index pattern anchors in one Aho-Corasick automaton.
    */
-  private codeToRegex(code: string): RegExp | null {
-    // Escape special regex chars but keep structure
-    let pattern = this.escapeRegex(code.trim());
+  private buildPatternIndex(patterns: CompiledPattern[]): PatternIndex {
+    const index: PatternIndex = { automaton: new AhoCorasick(), unanchored: [] };
 
-    // Make whitespace flexible
-    pattern = pattern.replace(/ +/g, "\\s+");
-    pattern = pattern.replace(/\\n/g, "\\s*");
+    patterns.forEach((pattern, i) => {
+      if (pattern.anchor) {
+        index.automaton.add(pattern.anchor, i);
+      } else {
+        index.unanchored.push(i);
+      }
+    });
 
-    // Make string quotes flexible
-    pattern = pattern.replace(/"/g, '["\']');
-    pattern = pattern.replace(/'/g, '["\']');
+    return index;
+  }
 
-    try {
-      return new RegExp(pattern, "ms"); // multiline, dotall
-    } catch {
-      return null;
+  /**
+   * Patterns whose regex matches the code, in criteria order.
+   *
+   * A single automaton pass finds which anchors occur. Literal patterns are
+   * confirmed by the hit itself; the rest (plus unanchored ones) have their
+   * regex run to confirm.
+   */
+  private matchingPatterns(
+    code: string,
+    patterns: CompiledPattern[],
+    index: PatternIndex
+  ): CompiledPattern[] {
+    const candidates = new Set<number>(index.unanchored);
+    for (const match of index.automaton.iter(code)) {
+      candidates.add(match.value);
     }
+
+    return patterns.filter(
+      (pattern, i) =>
+        candidates.has(i) &&
+        (pattern.literal || this.patternRegex(pattern)?.test(code) === true)
+    );
   }
 
   /**
-   * Escape special regex characters.
+   * Compiled regex for a pattern, compiling it on first use.
    */
-  private escapeRegex(str: string): string {
-    return str.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+  private patternRegex(pattern: CompiledPattern): RegExp | null {
+    if (pattern.regex === undefined) {
+      pattern.regex = compileRegex(pattern.source);
+    }
+    return pattern.regex;
   }
 
   /**
@@ -114,37 +520,50 @@ export class CodeEvaluator {
       return result;
     }
 
+    // Extract imports and normalized lines once; the checks below reuse them
+    const lines = normalizeCodeLines(code);
+    const codeIndex: CodeIndex = {
+      code,
+      imports: this.extractImports(code),
+      lines,
+      lineSet: new Set(lines),
+      flexibleHits: null,
+      requiredFound: null,
+    };
+
     // Check imports
-    this.checkImports(code, result);
+    this.checkImports(codeIndex.imports, result);
 
     // Check for incorrect patterns
     this.checkIncorrectPatterns(code, result);
 
     // Check for correct patterns
-    this.checkCorrectPatterns(code, result);
+    this.checkCorrectPatterns(codeIndex, result);
 
     // Check rule-specific criteria
     for (const rule of this.criteria.rules) {
-      this.checkRule(code, rule, result);
+      this.checkRule(codeIndex, rule, result);
     }
 
-    // Calculate score
+    // Calculate score (passed and counts are kept current by addFinding)
     result.score = this.calculateScore(result);
 
-    // Update passed status
-    result.passed = !result.findings.some((f) => f.severity === Severity.ERROR);
-
-    // Update counts
-    result.errorCount = result.findings.filter(
-      (f) => f.severity === Severity.ERROR
-    ).length;
-    result.warningCount = result.findings.filter(
-      (f) => f.severity === Severity.WARNING
-    ).length;
-
     return result;
   }
 
+  /**
+   * Record a finding and keep the severity counts and passed flag in step.
+   */
+  private addFinding(result: EvaluationResult, finding: Finding): void {
+    result.findings.push(finding);
+    if (finding.severity === Severity.ERROR) {
+      result.errorCount++;
+      result.passed = false;
+    } else if (finding.severity === Severity.WARNING) {
+      result.warningCount++;
+    }
+  }
+
   /**
    * Check if code has valid syntax based on language.
    */
@@ -221,7 +640,8 @@ export class CodeEvaluator {
             fullMessage = `Line ${line + 1}, Col ${character + 1}: ${message}`;
           }
 
-          result.findings.push(
+          this.addFinding(
+            result,
             createFinding({
               severity: Severity.ERROR,
               rule: "syntax",
@@ -239,7 +659,8 @@ export class CodeEvaluator {
     } catch (error) {
       // If transpilation throws an unexpected error, treat as syntax error
       const errorMessage = error instanceof Error ? error.message : String(error);
-      result.findings.push(
+      this.addFinding(
+        result,
         createFinding({
           severity: Severity.ERROR,
           rule: "syntax",
@@ -281,7 +702,8 @@ export class CodeEvaluator {
     }
 
     if (errors.length > 0) {
-      result.findings.push(
+      this.addFinding(
+        result,
         createFinding({
           severity: Severity.ERROR,
           rule: "syntax",
@@ -294,6 +716,19 @@ export class CodeEvaluator {
     return true;
   }
 
+  /**
+   * Extract normalized Python import statements from code.
+   *
+   * Returns "from X import Y" and "import X" entries with aliases removed.
+   * Other languages yield an empty set.
+   */
+  private extractImports(code: string): ReadonlySet<string> {
+    if (this.criteria.language.toLowerCase() !== "python") {
+      return NO_IMPORTS;
+    }
+    return extractPythonImports(code);
+  }
+
   /**
    * Check import statements using regex matching.
    * Note: Without Python AST, we use regex-based matching.
@@ -302,86 +737,33 @@ export class CodeEvaluator {
    * (e.g., sync client + async credential). We only flag as incorrect when
    * ALL import lines in the pattern are present together.
    */
-  private checkImports(code: string, result: EvaluationResult): void {
-    const language = this.criteria.language.toLowerCase();
-
-    // Extract actual imports from code
-    const actualImports = new Set<string>();
-
-    if (language === "python") {
-      // Match "from X import Y" patterns
-      const fromImportRegex = /^from\s+([\w.]+)\s+import\s+(.+)$/gm;
-      let match: RegExpExecArray | null;
-
-      while ((match = fromImportRegex.exec(code)) !== null) {
-        const module = match[1];
-        const names = match[2]?.split(",").map((n) => n.trim()) ?? [];
-        for (const name of names) {
-          // Remove any "as alias" parts
-          const cleanName = name.split(/\s+as\s+/)[0]?.trim();
-          if (cleanName && module) {
-            actualImports.add(`from ${module} import ${cleanName}`);
-          }
-        }
-      }
-    }
-
+  private checkImports(
+    actualImports: ReadonlySet<string>,
+    result: EvaluationResult
+  ): void {
     // Check incorrect import patterns from criteria
     // Only flag as incorrect when:
     // 1. ALL imports in the pattern are present together
     // 2. The pattern is IMPORT-ONLY (no non-import lines showing misuse)
     //    If pattern has non-import lines, it's handled by checkRule/patternMatches
-    for (const pattern of this.criteria.incorrectPatterns) {
-      if (!pattern.code.toLowerCase().includes("import")) {
-        continue;
-      }
-
-      // Separate import lines from non-import lines in the pattern
-      const patternImports: string[] = [];
-      const nonImportLines: string[] = [];
-      
-      for (const line of pattern.code.split("\n")) {
-        const trimmedLine = line.trim();
-        if (trimmedLine.startsWith("#") || !trimmedLine) {
-          continue;
-        }
-        if (
-          trimmedLine.startsWith("from ") ||
-          trimmedLine.startsWith("import ")
-        ) {
-          // Normalize whitespace
-          const normalizedPattern = trimmedLine.split(/\s+/).join(" ");
-          patternImports.push(normalizedPattern);
-        } else {
-          nonImportLines.push(trimmedLine);
-        }
-      }
-
-      // Skip if no import lines found in pattern
-      if (patternImports.length === 0) {
-        continue;
-      }
-
-      // CRITICAL FIX: If pattern has non-import lines, skip here.
-      // These "mixed patterns" (import + misuse) are handled by patternMatches()
-      // which correctly requires ALL parts to match before flagging as incorrect.
-      // Without this check, we'd flag valid imports as incorrect just because
-      // they appear in an incorrect pattern that also shows their misuse.
-      if (nonImportLines.length > 0) {
-        continue;
-      }
-
-      // Check if ALL imports in the pattern are present in actual code
-      const allPresent = patternImports.every((pi) => actualImports.has(pi));
+    //
+    // Both conditions on the pattern side are resolved in compilePatterns().
+    for (const { section, imports: patternImports } of this.compiled.incorrectImportCombinations) {
+      // Check if ALL imports in the pattern are present in actual code.
+      // Only "from X import Y" statements are considered here.
+      const allPresent = patternImports.every(
+        (pi) => pi.startsWith("from ") && actualImports.has(pi)
+      );
       
       if (allPresent) {
         // All imports from the incorrect pattern are present together
-        result.findings.push(
+        this.addFinding(
+          result,
           createFinding({
             severity: Severity.ERROR,
             rule: "imports",
             message: `Incorrect import combination: ${patternImports.join(", ")}`,
-            suggestion: `Check acceptance criteria section: ${pattern.section}`,
+            suggestion: `Check acceptance criteria section: ${section}`,
           })
         );
       }
@@ -395,39 +777,39 @@ export class CodeEvaluator {
     code: string,
     result: EvaluationResult
   ): void {
-    for (const { section, regex } of this.incorrectRegexes) {
-      if (regex.test(code)) {
-        result.matchedIncorrect.push(section);
-        result.findings.push(
-          createFinding({
-            severity: Severity.ERROR,
-            rule: `pattern:${section}`,
-            message: `Incorrect pattern found from section: ${section}`,
-            suggestion: "Review acceptance criteria for correct usage",
-          })
-        );
-      }
+    const matches = this.matchingPatterns(code, this.compiled.incorrectRegexes, this.compiled.incorrectIndex);
+
+    for (const { section } of matches) {
+      result.matchedIncorrect.push(section);
+      this.addFinding(
+        result,
+        createFinding({
+          severity: Severity.ERROR,
+          rule: `pattern:${section}`,
+          message: `Incorrect pattern found from section: ${section}`,
+          suggestion: "Review acceptance criteria for correct usage",
+        })
+      );
     }
   }
 
   /**
    * Check for presence of correct patterns.
    */
-  private checkCorrectPatterns(code: string, result: EvaluationResult): void {
+  private checkCorrectPatterns(codeIndex: CodeIndex, result: EvaluationResult): void {
+    const code = codeIndex.code;
     const matchedSections = new Set<string>();
 
     // First pass: try compiled regex (exact structure match)
-    for (const { section, regex } of this.correctRegexes) {
-      if (regex.test(code)) {
-        result.matchedCorrect.push(section);
-        matchedSections.add(section);
-      }
+    for (const { section } of this.matchingPatterns(code, this.compiled.correctRegexes, this.compiled.correctIndex)) {
+      result.matchedCorrect.push(section);
+      matchedSections.add(section);
     }
 
     // Second pass: flexible matching for unmatched patterns
     for (const pattern of this.criteria.correctPatterns) {
       if (!matchedSections.has(pattern.section)) {
-        if (this.patternMatches(code, pattern, false)) {
+        if (this.patternMatches(codeIndex, pattern, false)) {
           result.matchedCorrect.push(pattern.section);
           matchedSections.add(pattern.section);
         }
@@ -439,14 +821,17 @@ export class CodeEvaluator {
    * Check code against a specific validation rule.
    */
   private checkRule(
-    code: string,
+    codeIndex: CodeIndex,
     rule: ValidationRule,
     result: EvaluationResult
   ): void {
+    const code = codeIndex.code;
+
     // Check for incorrect patterns in this rule
     for (const pattern of rule.incorrectPatterns) {
-      if (this.patternMatches(code, pattern, true)) {
-        result.findings.push(
+      if (this.patternMatches(codeIndex, pattern, true)) {
+        this.addFinding(
+          result,
           createFinding({
             severity: Severity.ERROR,
             rule: rule.name,
@@ -458,9 +843,14 @@ export class CodeEvaluator {
     }
 
     // Check for required patterns
+    if (rule.requiredPatterns.length > 0) {
+      codeIndex.requiredFound ??= this.findRequiredPatterns(code);
+    }
     for (const reqPattern of rule.requiredPatterns) {
-      if (!code.includes(reqPattern)) {
-        result.findings.push(
+      // An empty pattern is trivially present, as with includes("")
+      if (reqPattern && !codeIndex.requiredFound?.has(reqPattern)) {
+        this.addFinding(
+          result,
           createFinding({
             severity: Severity.WARNING,
             rule: rule.name,
@@ -480,58 +870,44 @@ export class CodeEvaluator {
    * - For correct patterns: FLEXIBLE matching (to allow variations)
    */
   private patternMatches(
-    code: string,
+    codeIndex: CodeIndex,
     pattern: CodePattern,
     isIncorrect: boolean
   ): boolean {
-    const patternCode = pattern.code.trim();
+    const prepared = this.getPreparedPattern(pattern);
 
-    // Remove comment lines from the pattern
-    const codeLines = patternCode
-      .split("\n")
-      .map((line) => line.trim())
-      .filter((line) => line && !line.startsWith("#"));
-
-    if (codeLines.length === 0) {
+    if (prepared.lineCount === 0) {
       return false;
     }
 
-    // Separate import lines from non-import lines
-    const importLines = codeLines.filter(
-      (line) => line.startsWith("from ") || line.startsWith("import ")
-    );
-    const nonImportLines = codeLines.filter(
-      (line) => !line.startsWith("from ") && !line.startsWith("import ")
-    );
-
     // Case 1: Pattern has BOTH imports AND non-import code (mixed pattern)
     // This is critical for incorrect patterns that show: import X + misuse X
     // We must require ALL parts to match to avoid false positives
-    if (importLines.length > 0 && nonImportLines.length > 0) {
-      const importsMatch = this.importPatternMatches(code, importLines);
+    if (prepared.imports.length > 0 && prepared.nonImportLineCount > 0) {
+      const importsMatch = this.importPatternMatches(codeIndex.imports, prepared.imports);
       if (!importsMatch) {
         return false;
       }
       // Also require the non-import lines to match
       if (isIncorrect) {
-        return this.multiLinePatternMatchesExact(code, nonImportLines);
+        return this.multiLinePatternMatchesExact(codeIndex.lineSet, prepared.nonImportLines);
       } else {
-        return this.multiLinePatternMatchesFlexible(code, nonImportLines);
+        return this.multiLinePatternMatchesFlexible(codeIndex, prepared.nonImportLines);
       }
     }
 
     // Case 2: Import-only pattern
-    if (importLines.length > 0) {
-      return this.importPatternMatches(code, importLines);
+    if (prepared.imports.length > 0) {
+      return this.importPatternMatches(codeIndex.imports, prepared.imports);
     }
 
     // Case 3: Code-only pattern (no imports)
     if (isIncorrect) {
       // Incorrect patterns: use EXACT matching to catch specific errors
-      return this.multiLinePatternMatchesExact(code, codeLines);
+      return this.multiLinePatternMatchesExact(codeIndex.lineSet, prepared.allLines);
     } else {
       // Correct patterns: use FLEXIBLE matching to allow variations
-      return this.multiLinePatternMatchesFlexible(code, codeLines);
+      return this.multiLinePatternMatchesFlexible(codeIndex, prepared.allLines);
     }
   }
 
@@ -543,52 +919,15 @@ export class CodeEvaluator {
    *   - sync credential + async client
    *   - async credential + sync client
    */
-  private importPatternMatches(code: string, importLines: string[]): boolean {
+  private importPatternMatches(
+    actualImports: ReadonlySet<string>,
+    patternImports: string[]
+  ): boolean {
     const language = this.criteria.language.toLowerCase();
     if (language !== "python") {
       return false;
     }
 
-    // Extract actual imports from code using regex
-    const actualImports = new Set<string>();
-    const fromImportRegex = /^from\s+([\w.]+)\s+import\s+(.+)$/gm;
-    const importRegex = /^import\s+(.+)$/gm;
-
-    let match: RegExpExecArray | null;
-    while ((match = fromImportRegex.exec(code)) !== null) {
-      const module = match[1];
-      const names = match[2]?.split(",").map((n) => n.trim()) ?? [];
-      for (const name of names) {
-        const cleanName = name.split(/\s+as\s+/)[0]?.trim();
-        if (cleanName && module) {
-          actualImports.add(`from ${module} import ${cleanName}`);
-        }
-      }
-    }
-
-    while ((match = importRegex.exec(code)) !== null) {
-      const names = match[1]?.split(",").map((n) => n.trim()) ?? [];
-      for (const name of names) {
-        const cleanName = name.split(/\s+as\s+/)[0]?.trim();
-        if (cleanName) {
-          actualImports.add(`import ${cleanName}`);
-        }
-      }
-    }
-
-    // Filter to only import lines from the pattern
-    const patternImports: string[] = [];
-    for (const importLine of importLines) {
-      if (
-        !importLine.startsWith("from ") &&
-        !importLine.startsWith("import ")
-      ) {
-        continue;
-      }
-      const normalizedPattern = importLine.split(/\s+/).join(" ");
-      patternImports.push(normalizedPattern);
-    }
-
     // No import lines found in pattern
     if (patternImports.length === 0) {
       return false;
@@ -608,40 +947,24 @@ export class CodeEvaluator {
    * not just parts of it.
    */
   private multiLinePatternMatchesExact(
-    code: string,
-    patternLines: string[]
+    codeLineSet: ReadonlySet<string>,
+    patternLines: PreparedLines
   ): boolean {
-    if (patternLines.length === 0) {
+    if (patternLines.normalized.length === 0) {
       return false;
     }
 
-    const codeLinesNormalized = code
-      .split("\n")
-      .map((line) => line.trim())
-      .filter((line) => line && !line.startsWith("#"))
-      .map((line) => line.split(/\s+/).join(" "));
-
+    // Exact line equality, so a set lookup replaces the scan over code lines
     let matchedCount = 0;
-    for (const patternLine of patternLines) {
-      const normalizedPattern = patternLine.split(/\s+/).join(" ");
-
-      if (normalizedPattern.length < 15) {
-        continue;
-      }
-
-      for (const codeLine of codeLinesNormalized) {
-        if (normalizedPattern === codeLine) {
-          matchedCount++;
-          break;
-        }
+    for (const normalizedPattern of patternLines.normalized) {
+      if (codeLineSet.has(normalizedPattern)) {
+        matchedCount++;
       }
     }
 
-    const significantLines = patternLines.filter((l) => l.length >= 15);
-    
     // For incorrect patterns, ALL significant lines must match
     // This prevents false positives when only part of the pattern is present
-    return matchedCount >= 1 && matchedCount === significantLines.length;
+    return matchedCount >= 1 && matchedCount === patternLines.significantCount;
   }
 
   /**
@@ -651,44 +974,75 @@ export class CodeEvaluator {
    * Allows variations like different formatting, extra parameters, or comments.
    */
   private multiLinePatternMatchesFlexible(
-    code: string,
-    patternLines: string[]
+    codeIndex: CodeIndex,
+    patternLines: PreparedLines
   ): boolean {
-    if (patternLines.length === 0) {
+    if (patternLines.normalized.length === 0) {
       return false;
     }
 
-    const codeLinesNormalized = code
-      .split("\n")
-      .map((line) => line.trim())
-      .filter((line) => line && !line.startsWith("#"))
-      .map((line) => line.split(/\s+/).join(" "));
+    codeIndex.flexibleHits ??= this.findFlexibleHits(codeIndex.lines);
 
     let matchedCount = 0;
-    for (const patternLine of patternLines) {
-      const normalizedPattern = patternLine.split(/\s+/).join(" ");
-
-      if (normalizedPattern.length < 15) {
-        continue;
+    for (const normalizedPattern of patternLines.normalized) {
+      if (codeIndex.flexibleHits.has(normalizedPattern)) {
+        matchedCount++;
       }
+    }
 
-      for (const codeLine of codeLinesNormalized) {
-        if (
-          codeLine.includes(normalizedPattern) ||
-          normalizedPattern.includes(codeLine)
-        ) {
-          matchedCount++;
-          break;
+    if (patternLines.significantCount <= 2) {
+      return matchedCount >= 1 && matchedCount === patternLines.significantCount;
+    }
+
+    return matchedCount >= 2;
+  }
+
+  /**
+   * Find the flexible pattern lines that some code line contains, or that
+   * contain some code line.
+   *
+   * Both directions are answered with one automaton scan each instead of
+   * comparing every pattern line against every code line.
+   */
+  private findFlexibleHits(codeLines: string[]): Set<string> {
+    const hits = new Set<string>();
+
+    // Code line contains pattern line: scan the code through the prebuilt
+    // pattern-line automaton. Lines never contain "\n", so joining with it
+    // cannot create matches that span two lines.
+    for (const match of this.compiled.flexibleLineIndex.iter(codeLines.join("\n"))) {
+      hits.add(match.value);
+    }
+
+    // Pattern line contains code line: index this code's lines and scan each
+    // remaining pattern line, stopping at its first hit
+    const codeLineIndex = new AhoCorasick<true>();
+    for (const line of new Set(codeLines)) {
+      codeLineIndex.add(line, true);
+    }
+    if (codeLineIndex.size > 0) {
+      for (const line of this.compiled.flexibleLines) {
+        if (!hits.has(line) && codeLineIndex.matches(line)) {
+          hits.add(line);
         }
       }
     }
 
-    const significantLines = patternLines.filter((l) => l.length >= 15);
-    if (significantLines.length <= 2) {
-      return matchedCount >= 1 && matchedCount === significantLines.length;
-    }
+    return hits;
+  }
 
-    return matchedCount >= 2;
+  /**
+   * Required patterns (across all rules) that occur in the code.
+   */
+  private findRequiredPatterns(code: string): Set<string> {
+    const found = new Set<string>();
+    if (this.compiled.requiredPatternIndex.size === 0) {
+      return found;
+    }
+    for (const match of this.compiled.requiredPatternIndex.iter(code)) {
+      found.add(match.value);
+    }
+    return found;
   }
 
   /**
@@ -703,12 +1057,10 @@ export class CodeEvaluator {
     let score = 100;
 
     // Deduct for errors
-    score -= result.findings.filter((f) => f.severity === Severity.ERROR)
-      .length * 20;
+    score -= result.errorCount * 20;
 
     // Deduct for warnings
-    score -= result.findings.filter((f) => f.severity === Severity.WARNING)
-      .length * 5;
+    score -= result.warningCount * 5;
 
     // Bonus for matching correct patterns
     score += result.matchedCorrect.length * 5;
@@ -724,6 +1076,37 @@ export class CodeEvaluator {
 // Helper Functions
 // =============================================================================
 
+/**
+ * Count findings per severity in a single pass.
+ *
+ * EvaluationResult keeps errorCount/warningCount current as findings are
+ * added; use this for bare finding lists such as Ralph loop iterations.
+ */
+export function countFindings(findings: readonly Finding[]): Record<Severity, number> {
+  const counts: Record<Severity, number> = {
+    [Severity.ERROR]: 0,
+    [Severity.WARNING]: 0,
+    [Severity.INFO]: 0,
+  };
+  for (const finding of findings) {
+    counts[finding.severity]++;
+  }
+  return counts;
+}
+
+/**
+ * Convert a finding to a plain object for JSON serialization.
+ */
+export function findingToDict(finding: Finding): Record<string, unknown> {
+  return {
+    severity: finding.severity,
+    rule: finding.rule,
+    message: finding.message,
+    line: finding.line,
+    suggestion: finding.suggestion,
+  };
+}
+
 /**
  * Convert evaluation result to a plain object for JSON serialization.
  */
@@ -735,13 +1118,7 @@ export function evaluationResultToDict(result: EvaluationResult): Record<string,
     score: result.score,
     error_count: result.errorCount,
     warning_count: result.warningCount,
-    findings: result.findings.map((f) => ({
-      severity: f.severity,
-      rule: f.rule,
-      message: f.message,
-      line: f.line,
-      suggestion: f.suggestion,
-    })),
+    findings: result.findings.map(findingToDict),
     matched_correct: result.matchedCorrect,
     matched_incorrect: result.matchedIncorrect,
   };
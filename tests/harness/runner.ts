@@ -23,7 +23,7 @@ import type {
 import { DEFAULT_GENERATION_CONFIG, Severity, createFinding } from "./types.js";
 import { SkillCopilotClient, checkCopilotAvailable } from "./copilot-client.js";
 import { AcceptanceCriteriaLoader } from "./criteria-loader.js";
-import { CodeEvaluator } from "./evaluator.js";
+import { CodeEvaluator, countFindings, findingToDict } from "./evaluator.js";
 import {
   RalphLoopController,
   createRalphConfig,
@@ -611,13 +611,7 @@ function summaryToDict(summary: EvaluationSummary): Record<string, unknown> {
       warning_count: r.warningCount,
       matched_correct: r.matchedCorrect,
       matched_incorrect: r.matchedIncorrect,
-      findings: r.findings.map((f) => ({
-        severity: f.severity,
-        rule: f.rule,
-        message: f.message,
-        line: f.line,
-        suggestion: f.suggestion,
-      })),
+      findings: r.findings.map(findingToDict),
     })),
   };
 }
@@ -736,6 +730,7 @@ function convertRalphToSummary(ralph: RalphLoopSummary): EvaluationSummary {
   for (const [scenarioName, loopResult] of ralph.scenarioResults) {
     const lastIteration = loopResult.iterations[loopResult.iterations.length - 1];
     if (lastIteration) {
+      const counts = countFindings(lastIteration.findings);
       results.push({
         skillName: ralph.skillName,
         scenario: scenarioName,
@@ -745,8 +740,8 @@ function convertRalphToSummary(ralph: RalphLoopSummary): EvaluationSummary {
         matchedIncorrect: [],
         score: lastIteration.score,
         passed: loopResult.converged,
-        errorCount: lastIteration.findings.filter(f => f.severity === Severity.ERROR).length,
-        warningCount: lastIteration.findings.filter(f => f.severity === Severity.WARNING).length,
+        errorCount: counts[Severity.ERROR],
+        warningCount: counts[Severity.WARNING],
       });
     }
   }